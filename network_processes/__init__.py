@@ -29,9 +29,24 @@ library enables the study of an SIR process using both HMF and GFs.
 
 
 '''
+from .sparse import SparseNetwork, erdos_renyi_edges, configuration_model_edges
+from .distributions import poisson_pk, exponential_pk, power_law_pk
 from .network import NETWORK
+from .components import component_labels, component_sizes, largest_component_sizes, largest_site_component_sizes
+from .generating import GeneratingFunction
+from .joint import JointGeneratingFunction
+from .degrees import DegreeDistribution
+from .trajectory import integrate_chunks
+from .fenwick import FenwickTree
+from .ensemble import EnsembleStatistics
 from .add_del import addition_deletion
 from .hmf import HMF 
 from .gfs import GFs
+from .gfs_sweep import GFsSweep
+from .gfs_overlay import GFsOverlay
 from .sto import STO
+from .sir import SIR
+from .ebcm import EBCM
 from .percolation import PERCOLATION
+from .percolation_sweep import PERCOLATIONSweep
+from .parallel import ParallelRepeatedExperiment
@@ -21,7 +21,9 @@
 
 from network_processes import *
 import epyc
-from scipy.integrate import odeint
+from scipy.integrate import odeint, solve_ivp
+from scipy.sparse import diags
+from scipy.special import gammaln, xlogy
 import numpy as np
 from collections import defaultdict
 
@@ -30,7 +32,27 @@ class addition_deletion(NETWORK):
     `scipy.integrate.odeint`. To customise this class, 
     modify the `initialisation` method, update the rate 
     equation calculation and how the results are reported.
+    
+    By default the system is integrated with `odeint`. Setting the `METHOD`
+    parameter instead integrates it with that `solve_ivp` method; the 
+    implicit methods 'BDF' and 'Radau' are given the sparse analytic 
+    Jacobian from `jacobian`, and 'LSODA' the same Jacobian packed into 
+    its band by `banded_jacobian`.
+    
+    By default only the final state is reported. Setting the `TRAJECTORY`
+    parameter also reports the state at every time in `time` as `trajectory`,
+    passing it to `trajectory_chunk` in chunks of at most `BUFFER_SIZE` points
+    as the integration proceeds; override this method to stream the chunks 
+    elsewhere (to disk, say) rather than keeping them in the results. The
+    trajectory is integrated with the `METHOD` solver, or 'LSODA' (the 
+    algorithm used by `odeint`) if none is given.
     '''
+    METHOD = 'method' # solve_ivp method, if not using odeint
+    TRAJECTORY = 'trajectory' # flag for reporting the whole trajectory
+    BUFFER_SIZE = 'buffer_size' # maximum number of trajectory points per chunk
+    
+    SHARED = True # the network is never modified
+
     def __init__(self):
         super(addition_deletion, self).__init__()
         
@@ -57,17 +79,35 @@ class addition_deletion(NETWORK):
         # flatten the dict values into an array
         return np.array([item for sublist in p0.values() for item in sublist]) 
     
-    def dpdt( self, p, t, k_max, n, c ):
+    def phi_k( self, c, k_max ):
+        '''Evaluates phi_k, the probability that a new node has degree k,
+        for every k below k_max. The Poisson distribution is computed from 
+        logarithms, so it does not overflow for large k_max.
+        :param c: the average degree of an oncoming node
+        :param k_max: the max cut-off degree
+        :returns: array of phi_k'''
+        ks = np.arange(0, k_max)
+        if self._POISSON:
+            return np.exp(xlogy(ks, c) - c - gammaln(ks + 1))
+        
+        if self._DELTA:
+            return (ks == c).astype(float)
+        
+        raise ValueError('No degree distribution for new nodes')
+    
+    def dpdt( self, p, t, k_max, n, c, phi = None ):
         '''Computes the rate equation for an addition-
-        deletion network [1].
+        deletion network [1]. The terms coupling p_k to p_{k-1} and p_{k+1}
+        are computed for all k at once from shifted slices of the state.
         
         :param y: flattened state vector
         :param t: current time
         :param k_max: the max cut-off degree
         :param n: class dimension
         :param c: average degree of new node
+        :param phi: array of phi_k, computed using `phi_k` if not given
         
-        :returns dy: flattened list of change functions
+        :returns dy: flattened array of change functions
         
         :References:
         -------------
@@ -76,47 +116,65 @@ class addition_deletion(NETWORK):
         '''
         # then reshape it to the original dimension (k_max*n)
         p = p.reshape(k_max, n) 
-    
-        # a fresh dict to store dp_k values
-        dp = defaultdict(list)
-        for k in range(0, k_max):
-            dp[k] = [0]*n   
-        
-        def _phi_k( c, k, POISSON, DELTA):
-            '''Evaluates phi_k for arg set.
-            :param c: the average degree of an oncoming node
-            :param k: the degree
-            :param POISSON: Bool flag for Poisson distribution
-            :param DELTA: Bool flag for delta function, (c,k)'''
-            if POISSON:
-                return (np.exp(-c)*c**k)/np.math.factorial(k)
-            
-            if DELTA:
-                if k is c:
-                    return 1.0
-                else:
-                    return 0.0
-            
-        # iterate over ks
-        for k, value in enumerate(p):
-            
-            # determine phi_k
-            phi_k = _phi_k(c, k, self._POISSON, self._DELTA)
-            
-            # rate equations for p_k
-            if k is 0:
-                # equation for k=0 case
-                dp[k] = -p[k] - k*p[k] + (k+1)*p[k+1] - c*p[k] + phi_k
-                
-            if k > 0 and k + 1 < len(p):
-                # equation general case
-                dp[k] = -p[k] - k*p[k] + (k+1)*p[k+1] + c*p[k-1] - c*p[k] + phi_k
-            
-            if k is len(p)-1:
-                # equation for k=k_max case
-                dp[k] = - p[k] - k*p[k] + c*p[k-1] - c*p[k] + phi_k
+        ks = np.arange(0, k_max)
+        
+        if phi is None:
+            phi = self.phi_k(c, k_max)
+        
+        # deletion, loss of edges and new edges from p_k itself
+        dp = -(1.0 + ks + c)[:, np.newaxis] * p + phi[:, np.newaxis]
+        
+        # edges lost from degree k+1 nodes, for k < k_max - 1
+        dp[:-1] += ks[1:, np.newaxis] * p[1:]
+        
+        # edges gained by degree k-1 nodes, for k > 0
+        dp[1:] += c * p[:-1]
             
-        return [item for sublist in dp.values() for item in sublist]
+        return dp.ravel()
+    
+    def jacobian( self, k_max, n, c ):
+        '''Computes the Jacobian of `dpdt`. The rate equations are linear
+        and couple each p_k only to p_{k-1} and p_{k+1}, so the Jacobian is 
+        constant and tridiagonal in k: in the flattened state it is a sparse
+        matrix with diagonals at offsets -n, 0 and n.
+        
+        :param k_max: the max cut-off degree
+        :param n: class dimension
+        :param c: average degree of new node
+        
+        :returns: the sparse Jacobian'''
+        ks = np.arange(0, k_max)
+        
+        # d(dp_k)/dp_k, d(dp_k)/dp_{k+1} and d(dp_k)/dp_{k-1}
+        main = np.repeat(-1.0 - ks - c, n)
+        upper = np.repeat(ks[1:] + 0.0, n)
+        lower = np.repeat(c + 0.0 * ks[1:], n)
+        
+        return diags([lower, main, upper], [-n, 0, n], format = 'csc')
+    
+    def banded_jacobian( self, k_max, n, c ):
+        '''Computes the Jacobian of `dpdt` in the packed banded format taken
+        by LSODA, which stores only the 2n + 1 diagonals within the band:
+        the diagonal at offset d is row n - d of the array.
+        
+        :param k_max: the max cut-off degree
+        :param n: class dimension
+        :param c: average degree of new node
+        
+        :returns: array of shape (2n + 1, k_max*n)'''
+        J = self.jacobian(k_max, n, c).todia()
+        packed = np.zeros((2 * n + 1, k_max * n))
+        for (d, diagonal) in zip(J.offsets, J.data):
+            packed[n - d] = diagonal
+        return packed
+    
+    def trajectory_chunk( self, params, ts, ps ):
+        '''Receives a chunk of the trajectory. By default the chunks are kept 
+        and reported in the results; override this to stream them elsewhere.
+        :param params: experimental parameters
+        :param ts: array of times
+        :param ps: array of shape (len(ts), k_max*n) of states'''
+        self._trajectory.append(ps)
     
     def do( self, params ):
         '''Performs the experiment. Un-packs the 
@@ -141,8 +199,41 @@ class addition_deletion(NETWORK):
         # initialise the sytem
         p0 = self.initialisation(G, k_max, n)
         
+        # the distribution of new node degrees is fixed
+        phi = self.phi_k(c, k_max)
+        
         # integrate the system
-        soln = odeint(self.dpdt, p0, t, args=(k_max, n, c))
+        method = params.get(self.METHOD, None)
+        trajectory = params.get(self.TRAJECTORY, False)
+        if method is None and not trajectory:
+            soln = odeint(self.dpdt, p0, t, args=(k_max, n, c, phi))
+        else:
+            # implicit methods use the analytic Jacobian, which LSODA takes banded
+            options = dict()
+            if method is None:
+                # match the odeint algorithm and tolerances
+                method = 'LSODA'
+                options['rtol'] = options['atol'] = 1.49012e-8
+            if method in ['BDF', 'Radau']:
+                options['jac'] = self.jacobian(k_max, n, c)
+            elif method == 'LSODA':
+                J = self.banded_jacobian(k_max, n, c)
+                options['jac'] = lambda ti, p: J
+                options['lband'] = options['uband'] = n
+            
+            f = lambda ti, p: self.dpdt(p, ti, k_max, n, c, phi)
+            if trajectory:
+                # stream the trajectory in chunks
+                self._trajectory = []
+                buffer_size = params.get(self.BUFFER_SIZE, None)
+                for (ts, soln) in integrate_chunks(f, p0, t, method, buffer_size, **options):
+                    self.trajectory_chunk(params, ts, soln)
+                if len(self._trajectory) > 0:
+                    rc['trajectory'] = np.concatenate(self._trajectory)
+                self._trajectory = None
+            else:
+                r = solve_ivp(f, (t[0], t[-1]), p0, method = method, t_eval = t, **options)
+                soln = r.y.T
         
         # report the results
         rc['sol'] = soln[-1]
@@ -0,0 +1,117 @@
+# Degree distribution of a network
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `NetworkProcesses`, for epidemic network 
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+from network_processes.generating import GeneratingFunction
+from network_processes.sparse import SparseNetwork
+
+
+class DegreeDistribution( object ):
+    '''A compact degree distribution held as an array of counts `N_k`
+    indexed by degree. The moments are computed once on construction,
+    so the object can be built when a network is created and shared by
+    every experiment that runs on it. A distribution can also be built 
+    directly from its probabilities using `from_pk`, with no network, in 
+    which case there are no counts and no order.
+    
+    :param degrees: array of the degree of every node'''
+    
+    def __init__( self, degrees ):
+        degrees = np.asarray(degrees, dtype=int)
+        
+        # number of nodes of each degree
+        self._Nk = np.bincount(degrees)
+        self._order = len(degrees)
+        self._moments(self._Nk / (self._order + 0.0))
+        
+    def _moments( self, pk ):
+        '''Stores the probabilities and computes the cached moments.
+        :param pk: array of probabilities'''
+        self._pk = pk
+        ks = np.arange(len(self._pk))
+        self._k_max = np.flatnonzero(self._pk)[-1]
+        self._ave_k = np.dot(ks, self._pk)
+        self._ave_k2 = np.dot(ks**2, self._pk)
+        
+        self._gf = None
+        
+    @classmethod
+    def from_pk( cls, pk ):
+        '''Builds a degree distribution from its probabilities, such as one 
+        of the analytic distributions in `distributions.py`, without a 
+        network. The probabilities are renormalised.
+        :param pk: array of probabilities, pk[k] = P(degree = k)
+        :returns: the degree distribution'''
+        pk = np.asarray(pk, dtype=float)
+        if len(pk) == 0 or (pk < 0).any() or pk.sum() <= 0:
+            raise ValueError('Degree probabilities must be non-negative and not all zero')
+        d = cls.__new__(cls)
+        d._Nk = None
+        d._order = None
+        d._moments(pk / pk.sum())
+        return d
+        
+    @classmethod
+    def from_network( cls, g ):
+        '''Builds the degree distribution of a network.
+        :param g: the network
+        :returns: the degree distribution'''
+        if isinstance(g, SparseNetwork):
+            return cls(g.degrees())
+        ks = dict(g.degree())
+        return cls(np.fromiter(ks.values(), dtype=int, count=len(ks)))
+    
+    def order( self ):
+        '''Returns the number of nodes N, or None if there is no network.'''
+        return self._order
+    
+    def Nk( self ):
+        '''Returns the array of counts, Nk[k] = number of nodes of degree k,
+        or None if there is no network.'''
+        return self._Nk
+    
+    def pk( self ):
+        '''Returns the array of probabilities, pk[k] = P(degree = k).'''
+        return self._pk
+    
+    def k_max( self ):
+        '''Returns the largest degree.'''
+        return self._k_max
+    
+    def average_degree( self ):
+        '''Returns the average degree <k>.'''
+        return self._ave_k
+    
+    def second_moment( self ):
+        '''Returns the second moment <k^2>.'''
+        return self._ave_k2
+    
+    def as_dict( self ):
+        '''Returns the distribution as a dictionary {degree: P_k} over
+        the degrees that occur, as used by `NETWORK.degree_distribution`.'''
+        ks = np.flatnonzero(self._pk)
+        return dict(zip(ks.tolist(), self._pk[ks].tolist()))
+    
+    def generating_function( self ):
+        '''Returns the `GeneratingFunction` of the distribution, building
+        it on first use.'''
+        if self._gf is None:
+            self._gf = GeneratingFunction(self._pk)
+        return self._gf
@@ -0,0 +1,72 @@
+# Analytic degree distributions
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+from scipy.special import gammaln, xlogy
+
+
+def poisson_pk( kmean, k_max ):
+    '''Returns the Poisson degree distribution with mean `kmean`, truncated
+    at `k_max` and renormalised. The probabilities are computed from
+    logarithms, so they do not overflow for large degrees.
+    :param kmean: the mean degree
+    :param k_max: the largest degree
+    :returns: array of P_k for k = 0 to k_max'''
+    ks = np.arange(k_max + 1)
+    pk = np.exp(xlogy(ks, kmean) - kmean - gammaln(ks + 1))
+    return pk / pk.sum()
+
+
+def exponential_pk( kmean, k_max ):
+    '''Returns the exponential (geometric) degree distribution with mean
+    `kmean`, P_k proportional to (kmean / (1 + kmean))^k, truncated at
+    `k_max` and renormalised.
+    :param kmean: the mean degree
+    :param k_max: the largest degree
+    :returns: array of P_k for k = 0 to k_max'''
+    ks = np.arange(k_max + 1)
+    pk = np.exp(ks * (np.log(kmean) - np.log1p(kmean)))
+    return pk / pk.sum()
+
+
+def power_law_pk( exponent, k_max, cutoff = None, k_min = 1 ):
+    '''Returns the power-law degree distribution with an exponential cutoff,
+    P_k proportional to k^(-exponent) exp(-k / cutoff) for k from `k_min`
+    to `k_max`, renormalised [1]. Without a cutoff this is a pure power law,
+    truncated at `k_max`.
+    :param exponent: the exponent of the power law
+    :param k_max: the largest degree
+    :param cutoff: the scale of the exponential cutoff (defaults to none)
+    :param k_min: the smallest degree, at least 1
+    :returns: array of P_k for k = 0 to k_max
+
+    :References:
+    -------------
+    .. [1] M. E. J. Newman. 'Spread of epidemic disease on networks',
+           Phys. Rev. E, vol. 66, p. 016128, 2002.'''
+    if k_min < 1:
+        raise ValueError('Power-law degrees must be at least 1')
+    ks = np.arange(k_min, k_max + 1)
+    logs = -exponent * np.log(ks)
+    if cutoff is not None:
+        logs -= ks / (cutoff + 0.0)
+    pk = np.zeros(k_max + 1)
+    pk[k_min:] = np.exp(logs - logs.max())
+    return pk / pk.sum()
@@ -0,0 +1,86 @@
+# Streaming statistics over an ensemble of realisations
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+
+
+class EnsembleStatistics( object ):
+    '''Accumulates the mean, variance and quantiles of a vector of
+    non-negative integer counts, such as the final state of a stochastic
+    simulation, one realisation at a time. The mean and variance are
+    updated using Welford's algorithm, and the quantiles are exact, read
+    from a histogram of each component, so the memory used depends on the
+    size of the counts but not on the number of realisations.'''
+
+    def __init__( self ):
+        self._n = 0
+        self._mean = None
+        self._m2 = None
+        self._counts = None
+
+    def add( self, x ):
+        '''Adds a realisation.
+        :param x: array of non-negative integer counts'''
+        x = np.asarray(x)
+        xs = np.rint(x).astype(np.int64)
+        if np.any(xs != x) or np.any(xs < 0):
+            raise ValueError('Realisations must be non-negative integer counts')
+
+        if self._n == 0:
+            self._mean = np.zeros(len(xs))
+            self._m2 = np.zeros(len(xs))
+            self._counts = np.zeros((len(xs), xs.max() + 1), dtype=np.int64)
+
+        # update the running mean and sum of squared deviations
+        self._n += 1
+        delta = xs - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (xs - self._mean)
+
+        # grow the histograms if needed, then count the realisation
+        if xs.max() >= self._counts.shape[1]:
+            grown = np.zeros((len(xs), 2 * xs.max() + 1), dtype=np.int64)
+            grown[:, :self._counts.shape[1]] = self._counts
+            self._counts = grown
+        self._counts[np.arange(len(xs)), xs] += 1
+
+    def size( self ):
+        '''Returns the number of realisations.'''
+        return self._n
+
+    def mean( self ):
+        '''Returns the mean of each component.'''
+        return self._mean
+
+    def variance( self ):
+        '''Returns the sample variance of each component.'''
+        if self._n < 2:
+            return np.zeros_like(self._mean)
+        return self._m2 / (self._n - 1)
+
+    def quantiles( self, qs ):
+        '''Returns the quantiles of each component, taking the q-quantile
+        to be the smallest value with at least a fraction q of the
+        realisations at or below it.
+        :param qs: list of quantiles, between 0 and 1
+        :returns: array of shape (len(qs), number of components)'''
+        cdf = np.cumsum(self._counts, axis = 1)
+        targets = np.maximum(np.ceil(np.asarray(qs) * self._n), 1)
+        return np.array([ [ np.searchsorted(c, q) for c in cdf ] for q in targets ])
@@ -0,0 +1,102 @@
+# Fenwick tree of weights for fast weighted selection
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+
+class FenwickTree( object ):
+    '''A Fenwick (binary indexed) tree over an array of non-negative
+    weights [1]. Changing a weight, finding a prefix sum and selecting
+    the element in which a given cumulative weight falls all take
+    O(log K) time for K weights, rather than the O(K) of recomputing
+    a cumulative sum. The tree is held as a Python list, since it is
+    updated one element at a time; integer weights are summed exactly.
+
+    :param weights: the initial weights
+
+    :References:
+    -------------
+    .. [1] P. M. Fenwick. 'A new data structure for cumulative frequency
+           tables', Software: Practice and Experience, vol. 24, pp. 327-336,
+           1994.'''
+
+    def __init__( self, weights ):
+        weights = list(weights)
+        n = len(weights)
+        self._weights = weights
+        self._tree = [0] + weights
+
+        # build in O(K) by pushing each partial sum to its parent
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                self._tree[j] += self._tree[i]
+
+        # the largest power of two not above n, for the search
+        self._top = 1
+        while self._top * 2 <= n:
+            self._top *= 2
+
+    def __len__( self ):
+        return len(self._weights)
+
+    def weight( self, i ):
+        '''Returns the weight of an element.
+        :param i: the element'''
+        return self._weights[i]
+
+    def add( self, i, delta ):
+        '''Adds to the weight of an element.
+        :param i: the element
+        :param delta: the change in weight'''
+        self._weights[i] += delta
+        n = len(self._weights)
+        i += 1
+        while i <= n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix( self, i ):
+        '''Returns the sum of the weights of the elements before element i.
+        :param i: the element'''
+        s = 0
+        while i > 0:
+            s += self._tree[i]
+            i -= i & -i
+        return s
+
+    def total( self ):
+        '''Returns the sum of all the weights.'''
+        return self.prefix(len(self._weights))
+
+    def find( self, u ):
+        '''Returns the element in which the cumulative weight u falls, that
+        is the first element i for which the sum of the weights up to and
+        including i exceeds u.
+        :param u: the cumulative weight, between 0 and the total
+        :returns: the element'''
+        n = len(self._weights)
+        pos = 0
+        step = self._top
+        while step > 0:
+            j = pos + step
+            if j <= n and self._tree[j] <= u:
+                pos = j
+                u -= self._tree[j]
+            step //= 2
+        return min(pos, n - 1)
@@ -0,0 +1,124 @@
+# Vectorised generating functions for a degree distribution
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+from numpy.polynomial import polynomial
+
+
+class GeneratingFunction( object ):
+    '''Dense generating functions for a degree distribution. The
+    distribution is held as an array `pk` indexed by degree, so that
+    `G_0`, `G_1` and their derivatives are evaluated as polynomials
+    using Horner's scheme. Every method accepts either a scalar or an
+    array of arguments `x`, so a batch of transmissibilities can be
+    evaluated in a single call. For |x| < 1 the terms of high degree 
+    vanish geometrically, so only the terms that can affect the result 
+    in double precision are evaluated; this makes distributions with 
+    very large maximum degrees cheap to evaluate away from x = 1.
+
+    :param pk: array of probabilities, pk[k] = P(degree = k)'''
+
+    def __init__( self, pk ):
+        pk = np.asarray(pk, dtype=float)
+
+        # trim trailing zeros so the polynomials have minimal order
+        nz = np.flatnonzero(pk)
+        k_max = nz[-1] if len(nz) > 0 else 0
+        self._pk = pk[:k_max + 1]
+
+        # the degrees and the average degree
+        self._k = np.arange(len(self._pk))
+        self._ave_k = np.dot(self._k, self._pk)
+
+        # coefficients of G_0 and G_1 = G_0' / <k>
+        self._G_0 = self._pk
+        self._G_0_prime = polynomial.polyder(self._G_0)
+        self._G_1 = self._G_0_prime / self._ave_k
+        self._G_1_prime = polynomial.polyder(self._G_1)
+
+    def _evaluate( self, x, c ):
+        '''Evaluates a polynomial with non-negative coefficients, dropping
+        the terms that are negligible for every argument. Since the sum of
+        the terms beyond degree n is at most max(c) |x|^n / (1 - |x|), they
+        are dropped once that is below the machine epsilon relative to the
+        value of the polynomial at x = 1.
+        :param x: argument, scalar or array
+        :param c: the coefficients
+        :returns: the polynomial at x'''
+        if len(c) > 64:
+            x_max = np.max(np.abs(x))
+            if x_max == 0:
+                c = c[:1]
+            elif x_max < 1:
+                bound = np.finfo(float).eps * c.sum() * (1 - x_max) / c.max()
+                n = int(np.ceil(np.log(bound) / np.log(x_max))) + 1
+                c = c[:max(n, 1)]
+        return polynomial.polyval(x, c)
+    
+    @classmethod
+    def from_dict( cls, Pk ):
+        '''Builds the generating functions from a degree distribution
+        stored as a dictionary {degree: P_k}, as returned by
+        `NETWORK.degree_distribution`.
+        :param Pk: degree distribution
+        :returns: the generating functions'''
+        ks = np.fromiter(Pk.keys(), dtype=int)
+        ps = np.fromiter(Pk.values(), dtype=float)
+        pk = np.zeros(ks.max() + 1)
+        pk[ks] = ps
+        return cls(pk)
+
+    def pk( self ):
+        '''Returns the dense degree distribution array.'''
+        return self._pk
+
+    def average_degree( self ):
+        '''Returns the average degree <k>.'''
+        return self._ave_k
+
+    def G_0( self, x ):
+        r'''Evaluates
+
+         .. math::
+
+             G_0(x) = \sum_{k=0}^\infty p_k x^k
+
+        :param x: argument, scalar or array'''
+        return self._evaluate(x, self._G_0)
+
+    def G_0_prime( self, x ):
+        '''Evaluates the derivative of `G_0`.
+        :param x: argument, scalar or array'''
+        return self._evaluate(x, self._G_0_prime)
+
+    def G_1( self, x ):
+        r'''Evaluates
+
+         .. math::
+
+             G_1(x) = \frac{1}{\langle k \rangle}\sum_{k=0}^\infty (k+1)p_{k+1}x^k
+
+        :param x: argument, scalar or array'''
+        return self._evaluate(x, self._G_1)
+
+    def G_1_prime( self, x ):
+        '''Evaluates the derivative of `G_1`.
+        :param x: argument, scalar or array'''
+        return self._evaluate(x, self._G_1_prime)
@@ -22,6 +22,9 @@
 from network_processes import *
 import networkx
 import epyc
+import numpy as np
+from scipy.optimize import brentq
+from collections import OrderedDict
 
 
 class GFs( NETWORK ):
@@ -40,9 +43,23 @@ class GFs( NETWORK ):
     .. [3] Funk & Jansen (2010) `Interacting epidemics on overlay networks`
     '''     
     T = 'T' # transmissibility 
+    SOLVER = 'solver' # method used to find the fixed point
+    TOLERANCE = 'tolerance' # convergence tolerance on u
+    MAX_ITERATIONS = 'max_iterations' # iteration cap for the solver
+    SIZE_DISTRIBUTION = 'size_distribution' # largest small outbreak size to report
     
+    # solver methods
+    ITERATE = 'iterate' # fixed number of direct iterations
+    FIXED_POINT = 'fixed_point' # direct iteration until converged
+    NEWTON = 'newton' # Newton's method with a Brent fallback
+    
+    SHARED = True # the network is never modified
+    
+    CACHE_SIZE = 32 # number of outbreak size distributions kept
+
     def __init__(self):
         super(GFs, self).__init__()
+        self._distributions = OrderedDict()
         
     def G_0_generating_function( self, Pk, ave_k, x ):
         r'''Computes a `G_0` generating function as 
@@ -76,23 +93,259 @@ class GFs( NETWORK ):
                 summation += k*Pk[k]*x**(k-1)
         return (summation + 0.0)/ave_k
     
+    def solve( self, gf, T, solver = ITERATE, tolerance = 1e-10, max_iterations = 2000, u0 = None ):
+        '''Solves the fixed point `u = 1 - G_1(1 - uT)` for the probability
+        `u` that an edge leads to the giant outbreak. The argument `T` may be 
+        an array of transmissibilities, in which case every fixed point is 
+        solved simultaneously. The available solvers are:
+        
+        `ITERATE`: a fixed number `max_iterations` of direct iterations.
+        
+        `FIXED_POINT`: direct iteration, stopping once `u` changes by less
+        than `tolerance`.
+        
+        `NEWTON`: Newton's method using `G_1'`. Below the epidemic threshold
+        `T G_1'(1) <= 1` the only solution is `u = 0`, which is returned 
+        directly. Above it, Newton's method started from `u = 1` converges
+        monotonically; points that have not converged within `max_iterations` 
+        (typically close to the threshold) are bracketed and finished with 
+        Brent's method.
+        
+        :param gf: the `GeneratingFunction` of the degree distribution
+        :param T: transmissibility, scalar or array
+        :param solver: the solver method
+        :param tolerance: convergence tolerance on `u`
+        :param max_iterations: maximum number of iterations per point
+        :param u0: initial guess(es) for `u`, or None for the default
+        :returns: solutions `u`, iterations used and residuals, shaped like `T`'''
+        T = np.asarray(T, dtype=float)
+        shape = T.shape
+        T = T.ravel()
+        
+        # initial guesses
+        if u0 is None:
+            u0 = 1.0 if solver == self.NEWTON else 0.5
+        u = np.array(np.broadcast_to(u0, shape), dtype=float).ravel()
+        iterations = np.zeros(T.shape, dtype=int)
+        
+        def f( v, t ):
+            '''The fixed point residual, zero at the solution.'''
+            return v - 1 + gf.G_1(1 - v*t)
+        
+        if solver == self.ITERATE:
+            for i in range(0, max_iterations):
+                u = 1 - gf.G_1(1 - u*T)
+            iterations[:] = max_iterations
+            
+        elif solver == self.FIXED_POINT:
+            active = np.arange(len(T))
+            for i in range(0, max_iterations):
+                if len(active) == 0:
+                    break
+                v = 1 - gf.G_1(1 - u[active]*T[active])
+                converged = np.abs(v - u[active]) < tolerance
+                u[active] = v
+                iterations[active] += 1
+                active = active[~converged]
+                
+        elif solver == self.NEWTON:
+            # sub-critical points only have the trivial solution
+            critical = T * gf.G_1_prime(1.0) > 1
+            u[~critical] = 0.0
+            active = np.flatnonzero(critical)
+            unconverged = np.zeros(T.shape, dtype=bool)
+            
+            for i in range(0, max_iterations):
+                if len(active) == 0:
+                    break
+                t = T[active]
+                v = u[active]
+                df = 1 - t*gf.G_1_prime(1 - v*t)
+                
+                # hand points with a non-positive slope over to bracketing
+                stalled = df <= 0
+                step = f(v, t) / np.where(stalled, 1.0, df)
+                u[active] = np.where(stalled, v, v - step)
+                iterations[active] += 1
+                unconverged[active[stalled]] = True
+                active = active[~(stalled | (np.abs(step) < tolerance))]
+            unconverged[active] = True
+            
+            # finish any unconverged points by bracketing
+            for j in np.flatnonzero(unconverged):
+                t = T[j]
+                
+                # f is convex and non-negative at u = 1: find a lower bracket
+                a = min(u[j], 1.0)
+                while a > tolerance and f(a, t) >= 0:
+                    a *= 0.5
+                if a <= tolerance:
+                    u[j] = 0.0
+                    continue
+                u[j], r = brentq(f, a, 1.0, args = (t,), xtol = tolerance, 
+                                 full_output = True)
+                iterations[j] += r.iterations
+                
+        else:
+            raise ValueError('Unknown solver {s}'.format(s = solver))
+            
+        residual = np.abs(f(u, T))
+        return u.reshape(shape), iterations.reshape(shape), residual.reshape(shape)
+    
+    def outbreak_size( self, gf, T, u ):
+        '''Returns the outbreak size `S = 1 - G_0(1 - uT)` given the 
+        solution `u` of the fixed point. 
+        :param gf: the `GeneratingFunction` of the degree distribution
+        :param T: transmissibility, scalar or array
+        :param u: solution of the fixed point, scalar or array
+        :returns: the outbreak size(s)'''
+        return 1 - gf.G_0(1 - np.asarray(u)*T)
+    
+    def sweep( self, gf, Ts, solver = NEWTON, tolerance = 1e-10, max_iterations = 2000 ):
+        '''Solves the outbreak size for a whole vector of transmissibilities
+        at once. A coarse subset of the points is solved first, and every
+        point is then warm-started from the solution at the nearest coarse
+        point with a transmissibility at least as large, which lies above 
+        its own solution since `u` increases with `T`. All points are solved 
+        simultaneously as one vectorised iteration.
+        :param gf: the `GeneratingFunction` of the degree distribution
+        :param Ts: array of transmissibilities
+        :param solver: the solver method, see `solve`
+        :param tolerance: convergence tolerance on `u`
+        :param max_iterations: maximum number of iterations per point
+        :returns: outbreak sizes, solutions `u`, iterations and residuals, 
+        as arrays ordered like `Ts`'''
+        Ts = np.asarray(Ts, dtype=float)
+        
+        # solve every stride-th point of the sorted grid, plus the largest
+        order = np.argsort(Ts)
+        stride = int(np.ceil(np.sqrt(len(Ts))))
+        coarse = np.union1d(order[::stride], order[-1:])
+        coarse = coarse[np.argsort(Ts[coarse])]
+        u_c, it_c, res_c = self.solve(gf, Ts[coarse], solver, tolerance, max_iterations)
+        
+        # warm-start all the points from their coarse neighbours
+        neighbours = np.searchsorted(Ts[coarse], Ts, side = 'left')
+        u, iterations, residual = self.solve(gf, Ts, solver, tolerance, max_iterations, 
+                                             u0 = u_c[neighbours])
+        iterations[coarse] += it_c
+        
+        return self.outbreak_size(gf, Ts, u), u, iterations, residual
+    
+    def H_1( self, gf, T, x, tolerance = 1e-12, max_iterations = 100 ):
+        '''Evaluates the generating function `H_1` of the size of the small
+        outbreak reached along an edge, the solution of
+        `H_1(x) = x G_1(1 + (H_1(x) - 1)T)`, at complex arguments |x| <= 1.
+        Newton's method is started from `x H_1(1)`, with `H_1(1) = 1 - u` 
+        found by `solve`; any step that leaves the unit disc, where `H_1` 
+        lies, is replaced by a direct iteration.
+        :param gf: the `GeneratingFunction` of the degree distribution
+        :param T: transmissibility
+        :param x: arguments, scalar or array
+        :param tolerance: convergence tolerance on `H_1`
+        :param max_iterations: maximum number of iterations per argument
+        :returns: `H_1` at x'''
+        x = np.asarray(x, dtype=complex)
+        u, iterations, residual = self.solve(gf, T, self.NEWTON)
+        h = (x * (1 - u)).ravel()
+        xs = x.ravel()
+        
+        active = np.arange(len(xs))
+        for i in range(0, max_iterations):
+            if len(active) == 0:
+                break
+            v, y = h[active], xs[active]
+            w = 1 + (v - 1)*T
+            g = y * gf.G_1(w)
+            step = (v - g) / (1 - y*T*gf.G_1_prime(w))
+            n = v - step
+            outside = ~(np.abs(n) <= 1)
+            n[outside] = g[outside]
+            h[active] = n
+            active = active[np.abs(n - v) >= tolerance]
+        return h.reshape(x.shape)
+    
+    def H_0( self, gf, T, x, h = None ):
+        '''Evaluates the generating function `H_0` of the size of the small
+        outbreak started from a randomly-chosen node, 
+        `H_0(x) = x G_0(1 + (H_1(x) - 1)T)`.
+        :param gf: the `GeneratingFunction` of the degree distribution
+        :param T: transmissibility
+        :param x: arguments, scalar or array
+        :param h: `H_1` at x, or None to compute it with `H_1`
+        :returns: `H_0` at x'''
+        x = np.asarray(x, dtype=complex)
+        if h is None:
+            h = self.H_1(gf, T, x)
+        return x * gf.G_0(1 + (h - 1)*T)
+    
+    def outbreak_distribution( self, gf, T, s_max ):
+        '''Returns the distribution of the sizes s of the small outbreaks
+        started from a randomly-chosen node, the coefficients of `H_0` [1]. 
+        The coefficients are found by the Cauchy integral over a circle of 
+        radius r < 1, as the fast Fourier transform of `H_0` at M >= 
+        2(s_max + 1) equally-spaced points, a power of two, so after the 
+        vectorised evaluation of `H_0` they cost O(M log M). The radius 
+        balances the aliasing of the coefficients beyond M,
+        r^M, against the rounding error amplified by r^-s_max. Above the 
+        epidemic threshold the probabilities sum to `1 - S`.
+        
+        The distributions are cached for each degree distribution and
+        transmissibility, up to `CACHE_SIZE` of them, and a cached distribution
+        answers any request with a smaller `s_max`. Each call returns a copy,
+        so the cache cannot be changed through the results.
+        :param gf: the `GeneratingFunction` of the degree distribution
+        :param T: transmissibility
+        :param s_max: the largest outbreak size
+        :returns: array of probabilities for s = 0 to s_max'''
+        key = (gf.pk().tobytes(), float(T))
+        if key in self._distributions and len(self._distributions[key]) > s_max:
+            self._distributions.move_to_end(key)
+            return self._distributions[key][:s_max + 1].copy()
+        
+        # points on the contour
+        M = 2 ** int(np.ceil(np.log2(2 * (s_max + 1))))
+        r = np.finfo(float).eps ** (2.0 / (3 * M))
+        xs = r * np.exp(2j * np.pi * np.arange(M) / M)
+        
+        # the coefficients, rescaled from the circle of radius r
+        cs = np.fft.fft(self.H_0(gf, T, xs)) / M
+        ss = np.arange(s_max + 1)
+        pi = np.maximum(cs[:s_max + 1].real * r ** -ss.astype(float), 0.0)
+        
+        self._distributions[key] = pi
+        if len(self._distributions) > self.CACHE_SIZE:
+            self._distributions.popitem(last = False)
+        return pi.copy()
+    
     def do( self, params ):
         '''Runs the experiment.  '''
         T1 = params[self.T]
         
         rc = dict()
-        g = self._network
-        Pk = self.degree_distribution(g)
-        ave_k = self.average_degree(Pk)
+        
+        # the degree distribution is computed once per network
+        Pk = self._degrees.as_dict()
+        ave_k = self._degrees.average_degree()
+        gf = self._degrees.generating_function()
+        
+        # solver settings
+        solver = params.get(self.SOLVER, self.ITERATE)
+        tolerance = params.get(self.TOLERANCE, 1e-10)
+        max_iterations = params.get(self.MAX_ITERATIONS, 2000)
         
         # first disease 
-        u = 0.5
-        for i in range(0,2000):
-            u = 1 - self.G_1_generating_function(Pk, ave_k, 1-u*T1)
-        S1 = 1 - self.G_0_generating_function(Pk, ave_k, 1-u*T1)
+        u, iterations, residual = self.solve(gf, T1, solver, tolerance, max_iterations)
+        S1 = float(self.outbreak_size(gf, T1, u))
     
         rc['S1'] = S1
+        rc['iterations'] = int(iterations)
+        rc['residual'] = float(residual)
         rc['Pk'] = Pk 
         rc['ave_k'] = ave_k
         
+        # the small outbreak sizes, if requested
+        if self.SIZE_DISTRIBUTION in params:
+            rc['pi'] = self.outbreak_distribution(gf, T1, params[self.SIZE_DISTRIBUTION])
+        
         return rc
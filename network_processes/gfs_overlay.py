@@ -0,0 +1,246 @@
+# Generating functions for interacting epidemics on overlay networks
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import numpy as np
+
+
+class GFsOverlay( GFs ):
+    r'''Generating functions for two diseases spreading one after the other
+    on a network made of overlaid layers, with complete cross-immunity [1].
+    The first disease spreads with transmissibility `T1` along the edges of
+    layer `FIRST_LAYER` (default 0); the second then spreads with
+    transmissibility `T2` along the edges of layer `SECOND_LAYER` (default 1)
+    among the nodes the first left susceptible.
+
+    The layers are described by their joint degree distribution, given as
+    the `JOINT_DISTRIBUTION` parameter in any form accepted by
+    `joint_generating_function` when `GENERATOR` is `JOINT`. There is then 
+    no network, and the degree distribution is that of the first layer. 
+    With any other generator the network is built as usual and overlaid on 
+    an independent copy of itself, with the same degree distribution.
+
+    Both outbreaks are solved with `solve_layers`, which solves the coupled
+    fixed point of every layer at once. `T1` and `T2` may be arrays, which
+    are broadcast together, so a whole grid of scenarios is solved in one
+    vectorised iteration. The outbreak sizes are reported as `S1` and `S2`.
+
+    :References:
+    -------------
+    .. [1] S. Funk and V. A. A. Jansen. 'Interacting epidemics on overlay
+           networks', Phys. Rev. E, vol. 81, p. 036118, 2010.'''
+
+    JOINT_DISTRIBUTION = 'joint_distribution' # the joint degree distribution of the layers
+    T1 = 'T1' # transmissibility of the first disease
+    T2 = 'T2' # transmissibility of the second disease
+    FIRST_LAYER = 'first_layer' # the layer the first disease spreads on
+    SECOND_LAYER = 'second_layer' # the layer the second disease spreads on
+    
+    # the joint degree distribution of the layers, with no network
+    JOINT = 'joint'
+    ANALYTIC_GENERATORS = GFs.ANALYTIC_GENERATORS + [JOINT]
+
+    def __init__(self):
+        super(GFsOverlay, self).__init__()
+
+    def configure( self, params ):
+        '''Builds the generating functions of the joint degree distribution,
+        given for the `JOINT` generator or otherwise taken from the network.
+        :param params: the experimental parameters'''
+        if params.get(self.GENERATOR, None) == self.JOINT:
+            # needed for the degree distribution
+            self._joint = self.joint_generating_function(params[self.JOINT_DISTRIBUTION])
+            super(GFsOverlay, self).configure(params)
+        else:
+            super(GFsOverlay, self).configure(params)
+            pk = self._degrees.pk()
+            self._joint = JointGeneratingFunction.independent(pk, pk)
+    
+    def degree_probabilities( self, params ):
+        '''Returns the degree distribution of the first layer for the `JOINT`
+        generator, and otherwise that of the analytic generator.
+        :param params: the experimental parameters
+        :returns: array of probabilities'''
+        if params[self.GENERATOR] == self.JOINT:
+            return self._joint.marginal(0)
+        return super(GFsOverlay, self).degree_probabilities(params)
+
+    def joint_generating_function( self, P ):
+        '''Returns the generating functions of a joint degree distribution,
+        given as a `JointGeneratingFunction`, an L-dimensional array or
+        `scipy.sparse` matrix indexed by degree, a dictionary from degree
+        tuples to probabilities, or a pair of arrays of degree vectors and
+        their probabilities.
+        :param P: the joint distribution
+        :returns: a `JointGeneratingFunction`'''
+        if isinstance(P, JointGeneratingFunction):
+            return P
+        if isinstance(P, dict):
+            return JointGeneratingFunction.from_dict(P)
+        if isinstance(P, tuple):
+            return JointGeneratingFunction(*P)
+        return JointGeneratingFunction.from_array(P)
+
+    def solve_layers( self, jgf, T, z = None, tolerance = 1e-10, max_iterations = 2000 ):
+        r'''Solves the coupled fixed point
+
+         .. math::
+
+             u_l = G_{1,l}(z) - G_{1,l}(z - T \circ u)
+
+        for the probability `u_l` that an edge of layer l leads to the giant
+        outbreak, where `T_l` is the transmissibility along edges of layer l.
+        Each layer-l neighbour of a node has already been made immune,
+        independently, with probability `1 - z_l`; by default `z` is one,
+        and the fixed point is the multi-layer form of `u = 1 - G_1(1 - uT)`.
+
+        `T` and `z` are arrays of shape (..., L) whose leading dimensions
+        are broadcast together, and every fixed point is solved at once.
+        Points below the epidemic threshold, where the spectral radius of
+        the matrix of derivatives of `G_1(z - T u)` at `u = 0` is at most
+        one, only have the solution `u = 0`. Above it, iteration started
+        from `u = G_1(z)` decreases monotonically to the solution. The
+        Newton step, solving the L by L linear system of every point
+        together, is taken whenever it keeps `u` above the solution, and
+        the direct iteration otherwise.
+
+        :param jgf: the `JointGeneratingFunction` of the layers
+        :param T: transmissibilities, array of shape (..., L)
+        :param z: probabilities that neighbours are not immune, array of
+        shape (..., L), or None for no immunity
+        :param tolerance: convergence tolerance on `u`
+        :param max_iterations: maximum number of iterations per point
+        :returns: solutions `u` of shape (..., L), and the iterations used
+        and largest residuals of shape (...)'''
+        L = jgf.layers()
+        T = np.asarray(T, dtype=float)
+        if z is None:
+            z = np.ones(L)
+        T, z = np.broadcast_arrays(T, np.asarray(z, dtype=float))
+        if T.shape[-1] != L:
+            raise ValueError('Transmissibilities must be given for {l} layers'.format(l = L))
+        shape = T.shape[:-1]
+        T = T.reshape(-1, L)
+        z = z.reshape(-1, L)
+        G_1z = jgf.G_1(z)
+
+        def F( v, t, y, g ):
+            '''The fixed point residual, non-negative above the solution.'''
+            return v - g + jgf.G_1(y - t*v)
+
+        # sub-critical points only have the trivial solution
+        M = jgf.G_1_jacobian(z) * T[:, np.newaxis, :]
+        critical = np.abs(np.linalg.eigvals(M)).max(axis = -1) > 1
+        u = np.where(critical[:, np.newaxis], G_1z, 0.0)
+        iterations = np.zeros(len(T), dtype=int)
+
+        active = np.flatnonzero(critical)
+        for i in range(0, max_iterations):
+            if len(active) == 0:
+                break
+            t, y, g, v = T[active], z[active], G_1z[active], u[active]
+            f = F(v, t, y, g)
+
+            # the Newton step, for points whose Jacobian is not singular
+            J = np.eye(L) - jgf.G_1_jacobian(y - t*v) * t[:, np.newaxis, :]
+            singular = np.abs(np.linalg.det(J)) < 1e-12
+            J[singular] = np.eye(L)
+            w = v - np.linalg.solve(J, f[..., np.newaxis])[..., 0]
+
+            # keep it only where it stays between the solution and v
+            ok = ~singular & (w >= 0).all(axis = -1) & (w <= v).all(axis = -1)
+            ok[ok] = (F(w[ok], t[ok], y[ok], g[ok]) >= 0).all(axis = -1)
+            w[~ok] = v[~ok] - f[~ok]
+
+            u[active] = w
+            iterations[active] += 1
+            active = active[np.abs(w - v).max(axis = -1) >= tolerance]
+
+        residual = np.abs(F(u, T, z, G_1z)).max(axis = -1)
+        return u.reshape(shape + (L,)), iterations.reshape(shape), residual.reshape(shape)
+
+    def layer_outbreak_size( self, jgf, T, u, z = None ):
+        '''Returns the outbreak size `S = G_0(z) - G_0(z - T u)` given the
+        solution `u` of `solve_layers`.
+        :param jgf: the `JointGeneratingFunction` of the layers
+        :param T: transmissibilities, array of shape (..., L)
+        :param u: solution of the fixed point, array of shape (..., L)
+        :param z: probabilities that neighbours are not immune, or None
+        :returns: the outbreak size(s)'''
+        if z is None:
+            z = np.ones(jgf.layers())
+        z = np.asarray(z, dtype=float)
+        return jgf.G_0(z) - jgf.G_0(z - np.asarray(T)*u)
+
+    def sequential( self, jgf, T1, T2, first = 0, second = 1, tolerance = 1e-10, max_iterations = 2000 ):
+        '''Solves the outbreak sizes of two diseases spreading one after the
+        other, the first on layer `first` and the second on layer `second`
+        among the nodes left susceptible. A layer-`first` neighbour of a
+        node is immune after the first outbreak with probability `T1 u_1`,
+        which gives the `z` of the second outbreak.
+        :param jgf: the `JointGeneratingFunction` of the layers
+        :param T1: transmissibility of the first disease, scalar or array
+        :param T2: transmissibility of the second disease, scalar or array
+        :param first: the layer of the first disease
+        :param second: the layer of the second disease
+        :param tolerance: convergence tolerance on `u`
+        :param max_iterations: maximum number of iterations per point
+        :returns: outbreak sizes `S1` and `S2`, iterations used and largest
+        residuals, as arrays of the broadcast shape of `T1` and `T2`'''
+        T1, T2 = np.broadcast_arrays(np.asarray(T1, dtype=float), np.asarray(T2, dtype=float))
+        L = jgf.layers()
+
+        # the first outbreak
+        T = np.zeros(T1.shape + (L,))
+        T[..., first] = T1
+        u, it_1, res_1 = self.solve_layers(jgf, T, None, tolerance, max_iterations)
+        S1 = self.layer_outbreak_size(jgf, T, u)
+
+        # the second outbreak, among the survivors of the first
+        z = np.ones(T1.shape + (L,))
+        z[..., first] = 1 - T1*u[..., first]
+        T = np.zeros(T2.shape + (L,))
+        T[..., second] = T2
+        v, it_2, res_2 = self.solve_layers(jgf, T, z, tolerance, max_iterations)
+        S2 = self.layer_outbreak_size(jgf, T, v, z)
+
+        return S1, S2, it_1 + it_2, np.maximum(res_1, res_2)
+
+    def do( self, params ):
+        '''Runs the experiment.
+        :param params: experimental parameters'''
+        rc = dict()
+
+        # solver settings
+        tolerance = params.get(self.TOLERANCE, 1e-10)
+        max_iterations = params.get(self.MAX_ITERATIONS, 2000)
+        first = params.get(self.FIRST_LAYER, 0)
+        second = params.get(self.SECOND_LAYER, 1)
+
+        S1, S2, iterations, residual = self.sequential(self._joint, params[self.T1], params[self.T2],
+                                                       first, second, tolerance, max_iterations)
+
+        rc['S1'] = S1
+        rc['S2'] = S2
+        rc['iterations'] = iterations
+        rc['residual'] = residual
+        rc['ave_k'] = self._joint.average_degrees()
+
+        return rc
@@ -0,0 +1,67 @@
+# Generating functions swept over a grid of transmissibilities
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `NetworkProcesses`, for epidemic network 
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import epyc
+import numpy as np
+
+
+class GFsSweep( GFs ):
+    '''Computes the outbreak size S(T) over a whole grid of transmissibilities
+    in a single experiment, rather than one `GFs` experiment per value of `T`. 
+    The degree distribution is derived once per network and every fixed point 
+    is solved simultaneously using `GFs.sweep`. The grid is given by scalar 
+    parameters, so the experiment can be run in an `epyc.Lab` alongside sweeps 
+    over other parameters. By default the sweep uses the `NEWTON` solver.'''
+    
+    T_MIN = 'T_min' # smallest transmissibility
+    T_MAX = 'T_max' # largest transmissibility
+    T_POINTS = 'T_points' # number of transmissibilities in the grid
+    
+    def __init__(self):
+        super(GFsSweep, self).__init__()
+        
+    def do( self, params ):
+        '''Runs the experiment.
+        :param params: experimental parameters'''
+        Ts = np.linspace(params[self.T_MIN], params[self.T_MAX], params[self.T_POINTS])
+        
+        rc = dict()
+        
+        # the degree distribution is computed once per network
+        Pk = self._degrees.as_dict()
+        ave_k = self._degrees.average_degree()
+        gf = self._degrees.generating_function()
+        
+        # solver settings
+        solver = params.get(self.SOLVER, self.NEWTON)
+        tolerance = params.get(self.TOLERANCE, 1e-10)
+        max_iterations = params.get(self.MAX_ITERATIONS, 2000)
+        
+        S1, u, iterations, residual = self.sweep(gf, Ts, solver, tolerance, max_iterations)
+        
+        rc['T'] = Ts
+        rc['S1'] = S1
+        rc['iterations'] = iterations
+        rc['residual'] = residual
+        rc['Pk'] = Pk
+        rc['ave_k'] = ave_k
+        
+        return rc
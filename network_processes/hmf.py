@@ -21,7 +21,8 @@
 from network_processes import *
 import networkx
 import epyc
-from scipy.integrate import ode
+from scipy.integrate import ode, solve_ivp
+from scipy.sparse import bmat, diags, csc_matrix
 import numpy as np
 
 class HMF( NETWORK ):
@@ -34,11 +35,58 @@ class HMF( NETWORK ):
     an np.array. 
     :func param_vector: returns the parameters required to update the model using `model`.
     
+    By default each degree class is integrated separately. Setting the `SYSTEM`
+    parameter to `STACKED` instead integrates every class at once as a single
+    3K-dimensional system, using `stacked_model` and `stacked_param_vector`,
+    with one call to `scipy.integrate.solve_ivp`. In both of these, theta(t) 
+    for class k depends only on I_k, so the classes do not interact. Setting 
+    `SYSTEM` to `COUPLED` integrates the stacked system using `coupled_model`, 
+    in which a single theta(t) is computed from all of the I_k. 
+    
+    The stacked systems are integrated using the `solve_ivp` method named by 
+    the `METHOD` parameter (default 'RK45'). The implicit methods 'BDF' and 
+    'Radau' are given the sparse analytic Jacobians `stacked_jacobian` and 
+    `coupled_jacobian`, which suits stiff systems with many classes. 'LSODA'
+    only works with dense or banded Jacobians, neither of which these are,
+    so it is left to estimate its own; it needs O(K^2) memory when it 
+    switches to its stiff method, and is best kept to systems of few classes.
+    
+    The systems are integrated up to time `HORIZON` (default 150). The stacked
+    and coupled systems can stop earlier: when the infected fraction falls 
+    below `EXTINCTION`, or when the norm of the derivative falls below 
+    `STEADY_STATE`, using the event functions from `events`. The time at 
+    which the integration stopped is reported as `stop_time`.
+    
+    If the `TIMES` parameter is given, the state averaged over the degree 
+    distribution is also reported at each of those times as `trajectory`, 
+    with the times as `times`, from a single integration to the last of 
+    these times rather than to `HORIZON`; if `HORIZON` is also given, none
+    of the times may come after it. If the integration stops early the trajectory ends at the 
+    stop time instead. The trajectory is 
+    passed to `trajectory_chunk` in chunks of at most `BUFFER_SIZE` points; 
+    override this method to stream the chunks elsewhere (to disk, say) 
+    rather than keeping them in the results.
+    
     :References:
     -------------
     .. [1] R. Pastor-Satorras and A. Vespignani. 'Epidemic spreading 
            in scale-free networks', Phys. Rev. Lett., vol. 86, pp. 3200-3203, 2001. '''
     
+    SYSTEM = 'system' # how the degree classes are integrated
+    METHOD = 'method' # solve_ivp method for the stacked systems
+    TIMES = 'times' # times at which to report the trajectory
+    HORIZON = 'horizon' # the time to integrate up to
+    EXTINCTION = 'extinction' # stop when the infected fraction falls below this
+    STEADY_STATE = 'steady_state' # stop when the derivative norm falls below this
+    BUFFER_SIZE = 'buffer_size' # maximum number of trajectory points per chunk
+    
+    # integration systems
+    PER_CLASS = 'per_class' # one integration per degree class
+    STACKED = 'stacked' # one integration of all classes together
+    COUPLED = 'coupled' # one integration of all classes with a shared theta
+    
+    SHARED = True # the network is never modified
+
     def __init__(self):
         super(HMF, self).__init__()
         
@@ -56,7 +104,8 @@ class HMF( NETWORK ):
             :returns: theta(t)'''
             summation = 0
             for k in Pk.keys():
-                summation += (k - 1) * Pk[k] * I_k
+                # nodes of degree zero are never reached along an edge
+                summation += max(k - 1, 0) * Pk[k] * I_k
             return ( summation + 0.0 ) / ave_k 
             
         # unpack current state
@@ -86,40 +135,336 @@ class HMF( NETWORK ):
         pRecover = params['pRecover']
         return pInfect, pRecover, k, ave_k, Pk
     
-    def do( self, params ):
-        '''runs the experiment.'''
-        rc = dict()
-        states = dict()
+    def stacked_model( self, t, y, pInfect, pRecover, ks, c ):
+        '''Return the changes in state for all the degree classes at once. 
+        The state is the flattened (3, K) array [S_k, I_k, R_k] over the 
+        degrees `ks`. As in `model`, theta(t) for class k is c * I_k.
+        :param t: current time
+        :param y: flattened state vector
+        :param pInfect: rate of infection
+        :param pRecover: rate of recovery
+        :param ks: array of degrees
+        :param c: sum of (k - 1) * P_k over all k > 0, divided by <k>
+        :returns: flattened change functions'''
+        S, I, R = y.reshape(3, -1)
         
-        # grab a copy of the network
-        g = self._network
+        # define the update equations 
+        infect = ks * pInfect * S * c * I
+        recover = pRecover * I
+            
+        return np.concatenate([-infect, infect - recover, recover])
+    
+    def stacked_jacobian( self, t, y, pInfect, pRecover, ks, c ):
+        '''Return the Jacobian of `stacked_model`, a sparse (3K, 3K) matrix 
+        made of diagonal blocks.
+        :param t: current time
+        :param y: flattened state vector
+        :param pInfect: rate of infection
+        :param pRecover: rate of recovery
+        :param ks: array of degrees
+        :param c: sum of (k - 1) * P_k over all k > 0, divided by <k>
+        :returns: the Jacobian'''
+        S, I, R = y.reshape(3, -1)
+        a = ks * pInfect * c
+        zero = csc_matrix((len(ks), len(ks)))
         
-        # find the degree distribution
-        Pk = self.degree_distribution(g)
+        # derivatives of the infection term with respect to S_k and I_k
+        dS = diags(a * I)
+        dI = diags(a * S)
+        recover = diags(pRecover * np.ones(len(ks)))
+        
+        return bmat([[-dS, -dI, zero],
+                     [dS, dI - recover, zero],
+                     [None, recover, zero]], format = 'csc')
+    
+    def stacked_param_vector( self, params, ks, ave_k, pk ):
+        '''A vector of parameters required for the stacked integrator.
+        :param params: the experimental parameters
+        :param ks: array of degrees
+        :param ave_k: the average degree
+        :param pk: array of P_k for the degrees `ks`'''
+        pInfect = params['pInfect']
+        pRecover = params['pRecover']
+        c = np.dot(np.maximum(ks - 1, 0), pk) / ave_k
+        return pInfect, pRecover, ks, c
+    
+    def coupled_model( self, t, y, pInfect, pRecover, ks, weights ):
+        r'''Return the changes in state for all the degree classes at once,
+        coupled through the probability that an edge points to an infected 
+        node, 
+        
+         .. math::
+         
+             \theta(t) = \frac{1}{\langle k \rangle}\sum_{k > 0} (k - 1) P_k I_k(t)
+        
+        which is carried as an extra variable at the end of the state, 
+        starting from `coupled_auxiliary` and changing as the weighted sum of 
+        the changes in the I_k. This keeps the Jacobian sparse.
+        :param t: current time
+        :param y: flattened state vector, as in `stacked_model`, followed by theta
+        :param pInfect: rate of infection
+        :param pRecover: rate of recovery
+        :param ks: array of degrees
+        :param weights: array of max(k - 1, 0) * P_k / <k> for the degrees `ks`
+        :returns: flattened change functions'''
+        S, I, R = y[:-1].reshape(3, -1)
+        theta = y[-1]
+        
+        # define the update equations 
+        infect = ks * pInfect * S * theta
+        recover = pRecover * I
+            
+        return np.concatenate([-infect, infect - recover, recover, 
+                               [np.dot(weights, infect - recover)]])
+    
+    def coupled_jacobian( self, t, y, pInfect, pRecover, ks, weights ):
+        '''Return the Jacobian of `coupled_model`. Since theta(t) is a variable
+        of its own the blocks of the classes are diagonal, bordered by a row
+        and a column for theta, so the Jacobian has O(K) non-zero entries.
+        :param t: current time
+        :param y: flattened state vector
+        :param pInfect: rate of infection
+        :param pRecover: rate of recovery
+        :param ks: array of degrees
+        :param weights: array of max(k - 1, 0) * P_k / <k> for the degrees `ks`
+        :returns: the Jacobian'''
+        S, I, R = y[:-1].reshape(3, -1)
+        theta = y[-1]
+        a = ks * pInfect
+        zero = csc_matrix((len(ks), len(ks)))
+        
+        # derivatives of the infection term with respect to S_k and theta
+        dS = diags(a * theta)
+        dtheta = csc_matrix((a * S)[:, np.newaxis])
+        recover = diags(pRecover * np.ones(len(ks)))
+        
+        # derivatives of the change in theta
+        rows = [ csc_matrix(r[np.newaxis, :]) for r in [weights * a * theta, -pRecover * weights] ]
+        corner = csc_matrix([[np.dot(weights, a * S)]])
+        
+        return bmat([[-dS, None, None, -dtheta],
+                     [dS, -recover, None, dtheta],
+                     [None, recover, zero, None],
+                     [rows[0], rows[1], None, corner]], format = 'csc')
+    
+    def coupled_auxiliary( self, y0, pInfect, pRecover, ks, weights ):
+        '''Returns the initial value of theta for `coupled_model`.
+        :param y0: flattened initial state of the classes
+        :param pInfect: rate of infection
+        :param pRecover: rate of recovery
+        :param ks: array of degrees
+        :param weights: array of max(k - 1, 0) * P_k / <k> for the degrees `ks`
+        :returns: array holding theta(0)'''
+        return np.array([np.dot(weights, y0.reshape(3, -1)[1])])
+    
+    def coupled_param_vector( self, params, ks, ave_k, pk ):
+        '''A vector of parameters required for the coupled integrator.
+        :param params: the experimental parameters
+        :param ks: array of degrees
+        :param ave_k: the average degree
+        :param pk: array of P_k for the degrees `ks`'''
+        pInfect = params['pInfect']
+        pRecover = params['pRecover']
+        weights = np.maximum(ks - 1, 0) * pk / ave_k
+        return pInfect, pRecover, ks, weights
+    
+    def events( self, params, f, pk ):
+        '''Builds the terminal event functions for the stacked systems 
+        from the `EXTINCTION` and `STEADY_STATE` parameters.
+        :param params: the experimental parameters
+        :param f: the right-hand side of the stacked system, f(t, y), 
+        whose state starts with the S, I and R of each class
+        :param pk: array of P_k for the degree classes
+        :returns: list of event functions'''
+        events = []
+        
+        threshold = params.get(self.EXTINCTION, None)
+        if threshold is not None:
+            def extinction( t, y ):
+                return np.dot(y[len(pk):2 * len(pk)], pk) - threshold
+            extinction.terminal = True
+            extinction.direction = -1
+            events.append(extinction)
+        
+        tolerance = params.get(self.STEADY_STATE, None)
+        if tolerance is not None:
+            def steady_state( t, y ):
+                return np.linalg.norm(f(t, y)[:3 * len(pk)]) - tolerance
+            steady_state.terminal = True
+            steady_state.direction = -1
+            events.append(steady_state)
+        
+        return events
+    
+    def check_times( self, params, times ):
+        '''Checks the times at which to report the trajectory. There must be
+        at least one, they must not decrease, and if `HORIZON` is also given 
+        none may come after it.
+        :param params: the experimental parameters
+        :param times: the times
+        :returns: the times as an array'''
+        times = np.asarray(times, dtype=float)
+        if len(times) == 0:
+            raise ValueError('At least one time is needed for the trajectory')
+        if np.any(np.diff(times) < 0):
+            raise ValueError('The trajectory times must be in increasing order')
+        if self.HORIZON in params and times[-1] > params[self.HORIZON]:
+            raise ValueError('The trajectory cannot extend beyond the horizon {h}'.format(h = params[self.HORIZON]))
+        return times
+    
+    def trajectory_chunk( self, params, ts, ys ):
+        '''Receives a chunk of the trajectory. By default the chunks are kept 
+        and reported in the results; override this to stream them elsewhere.
+        :param params: the experimental parameters
+        :param ts: array of times
+        :param ys: array of shape (len(ts), 3) of states, averaged over the 
+        degree distribution'''
+        self._trajectory.append((ts, ys))
+    
+    def integrate_per_class( self, params, Pk, ave_k, times = None ):
+        '''Integrates each degree class separately.
+        :param params: the experimental parameters
+        :param Pk: the degree distribution
+        :param ave_k: the average degree
+        :param times: times at which to report the state (defaults to the
+        final time only)
+        :returns: array of shape (len(times), 3) of states, averaged over 
+        the degree distribution'''
+        t0 = 0
+        t1 = params.get(self.HORIZON, 150)
+        dt = 1
+        if times is None:
+            times = [t1]
+        states = np.zeros((len(times), 3))
         
-        # find the average degree of the network
-        ave_k = self.average_degree(Pk)
-
         for k in Pk.keys():
             
             # initial conditions vector for kth system
             y0 = self.initialisation(params)
             
             vec = self.param_vector(params, k, ave_k, Pk)
-            t0 = 0
-            
-            t1 = 150 
-            dt = 1
             
             r = ode(self.model).set_integrator('dopri5', method = 'adams')
             r.set_initial_value(y0, t0).set_f_params(*vec)       
             
-            while r.successful() and r.t < t1:
-                r.integrate(r.t+dt)
+            for (i, ti) in enumerate(times):
+                while r.successful() and r.t < ti:
+                    r.integrate(min(r.t + dt, ti))
+                
+                # report results for kth system
+                states[i] += r.y * Pk[k]
+        
+        return states
+    
+    def integrate_stacked( self, params, Pk, ave_k, model, param_vector, jacobian, times = None, auxiliary = None ):
+        '''Integrates all the degree classes together as one system. If 
+        `times` are given the trajectory at those times is passed to 
+        `trajectory_chunk` as the integration proceeds. The model may carry
+        auxiliary variables after the states of the classes, whose initial
+        values are given by `auxiliary`.
+        :param params: the experimental parameters
+        :param Pk: the degree distribution
+        :param ave_k: the average degree
+        :param model: the stacked model
+        :param param_vector: function returning the parameters of `model`
+        :param jacobian: the Jacobian of `model`
+        :param times: times at which to report the trajectory, as returned 
+        by `check_times`
+        :param auxiliary: function returning the initial auxiliary variables
+        from the initial states and the parameters of `model`, if any
+        :returns: the stop time and the final state, averaged over the 
+        degree distribution'''
+        ks = np.array(sorted(Pk.keys()))
+        pk = np.array([ Pk[k] for k in ks ])
+        n = 3 * len(ks)
+        
+        # initial conditions, the same for every class
+        y0 = np.outer(self.initialisation(params), np.ones(len(ks))).ravel()
+        
+        vec = param_vector(params, ks, ave_k, pk)
+        if auxiliary is not None:
+            y0 = np.concatenate([y0, auxiliary(y0, *vec)])
+        t0 = 0
+        t1 = params.get(self.HORIZON, 150)
+        
+        def f( t, y ):
+            return model(t, y, *vec)
+        events = self.events(params, f, pk)
+        
+        # implicit methods use the sparse analytic Jacobian
+        method = params.get(self.METHOD, 'RK45')
+        options = dict(rtol = 1e-6, atol = 1e-12)
+        if method in ['BDF', 'Radau']:
+            options['jac'] = lambda t, y: jacobian(t, y, *vec)
+        
+        if times is None:
+            r = solve_ivp(f, (t0, t1), y0, method = method, events = events, **options)
+            
+            # report final results, weighted over the classes
+            return r.t[-1], np.dot(r.y[:n, -1].reshape(3, -1), pk)
+        
+        # stream the trajectory, weighted over the classes
+        buffer_size = params.get(self.BUFFER_SIZE, None)
+        for (ts, ys) in integrate_chunks(f, y0, times, method, buffer_size, 
+                                         t0 = t0, events = events, **options):
+            states = np.dot(ys[:, :n].reshape(len(ts), 3, -1), pk)
+            self.trajectory_chunk(params, ts, states)
+        return ts[-1], states[-1]
+    
+    def do( self, params ):
+        '''runs the experiment.'''
+        rc = dict()
+        
+        # find the degree distribution, computed once per network
+        Pk = self._degrees.as_dict()
+        
+        # find the average degree of the network
+        ave_k = self._degrees.average_degree()
+        
+        # the times at which to report the trajectory, if any
+        times = params.get(self.TIMES, None)
+        if times is not None:
+            times = self.check_times(params, times)
+        self._trajectory = []
+        
+        system = params.get(self.SYSTEM, self.PER_CLASS)
+        if system == self.PER_CLASS:
+            # the classes are integrated one at a time, so cannot stop together
+            if (params.get(self.EXTINCTION, None) is not None or 
+                params.get(self.STEADY_STATE, None) is not None):
+                raise ValueError('Early termination needs a stacked or coupled system')
             
-            # report final results for kth system
-            states[k] = r.y * Pk[k]
+            states = self.integrate_per_class(params, Pk, ave_k, times)
+            if times is not None:
+                buffer_size = params.get(self.BUFFER_SIZE, len(times))
+                for i in range(0, len(times), buffer_size):
+                    self.trajectory_chunk(params, times[i:i + buffer_size], 
+                                          states[i:i + buffer_size])
+            rc['stop_time'] = float(params.get(self.HORIZON, 150) if times is None else times[-1])
+            rc['final_state'] = states[-1]
+        elif system == self.STACKED:
+            (t, states) = self.integrate_stacked(params, Pk, ave_k, 
+                                                 self.stacked_model, 
+                                                 self.stacked_param_vector,
+                                                 self.stacked_jacobian,
+                                                 times)
+            rc['stop_time'] = float(t)
+            rc['final_state'] = states
+        elif system == self.COUPLED:
+            (t, states) = self.integrate_stacked(params, Pk, ave_k, 
+                                                 self.coupled_model, 
+                                                 self.coupled_param_vector,
+                                                 self.coupled_jacobian,
+                                                 times, self.coupled_auxiliary)
+            rc['stop_time'] = float(t)
+            rc['final_state'] = states
+        else:
+            raise ValueError('Unknown integration system {s}'.format(s = system))
         
-        rc['final_state'] = sum(states.values())
+        # report the trajectory, if it was kept
+        if len(self._trajectory) > 0:
+            rc['times'] = np.concatenate([ ts for (ts, ys) in self._trajectory ])
+            rc['trajectory'] = np.concatenate([ ys for (ts, ys) in self._trajectory ])
+        self._trajectory = None
         
         return rc
@@ -0,0 +1,211 @@
+# Generating functions of a joint degree distribution over network layers
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+import scipy.sparse
+
+
+class JointGeneratingFunction( object ):
+    r'''Generating functions for the joint degree distribution of a network
+    made of L overlaid layers, in which a node has k_l edges in layer l [1].
+
+     .. math::
+
+         G_0(x) = \sum_k p_k \prod_l x_l^{k_l}, \qquad
+         G_{1,l}(x) = \frac{1}{\langle k_l \rangle}\frac{\partial G_0}{\partial x_l}
+
+    The distribution is held sparsely, as the array of degree vectors `ks`
+    that occur and their probabilities `ps`. When at least a fraction
+    `DENSITY` of the degrees up to the largest in each layer occur it is
+    also held as a dense array, and evaluated by matrix products. The
+    derivatives are precomputed as polynomials of their own. Every method
+    takes arguments `x` of shape (..., L), so a whole grid of arguments is
+    evaluated in one call, and returns values of shape (...), (..., L) or
+    (..., L, L).
+
+    :param ks: array of shape (n, L) of degree vectors
+    :param ps: array of n probabilities
+
+    :References:
+    -------------
+    .. [1] S. Funk and V. A. A. Jansen. 'Interacting epidemics on overlay
+           networks', Phys. Rev. E, vol. 81, p. 036118, 2010.'''
+
+    BLOCK = 2 ** 20 # largest number of terms evaluated at once
+    DENSITY = 0.25 # smallest fraction of non-zero terms held densely
+
+    def __init__( self, ks, ps ):
+        ks = np.asarray(ks, dtype=np.int64)
+        ps = np.asarray(ps, dtype=float)
+        if ks.ndim != 2 or len(ks) != len(ps) or (ks < 0).any() or (ps < 0).any():
+            raise ValueError('Joint degrees must be non-negative, with one probability each')
+        keep = ps > 0
+        self._ks = ks[keep]
+        self._ps = ps[keep] / ps[keep].sum()
+        self._G_0 = self._polynomial(self._ps, self._ks)
+        L = ks.shape[1]
+
+        # the mean degree in each layer, which G_1 divides by
+        self._ave_k = np.dot(self._ps, self._ks)
+        if (self._ave_k == 0).any():
+            raise ValueError('Every layer must have edges')
+
+        # the first and second derivatives of G_0, dropping vanishing terms
+        self._gradient = []
+        self._hessian = []
+        for l in range(L):
+            e_l = np.eye(L, dtype=np.int64)[l]
+            self._gradient.append(self._shift(self._ps * self._ks[:, l], self._ks, e_l))
+            row = []
+            for m in range(L):
+                e_m = np.eye(L, dtype=np.int64)[m]
+                c = self._ps * self._ks[:, l] * (self._ks[:, m] - e_l[m])
+                row.append(self._shift(c, self._ks, e_l + e_m))
+            self._hessian.append(row)
+
+    @classmethod
+    def _polynomial( cls, c, ks ):
+        '''Returns the polynomial with coefficients c and degrees ks, as the
+        coefficients and degrees of its terms and, if enough of its terms
+        are non-zero, as a dense array of coefficients indexed by degree.'''
+        dense = None
+        if len(c) > 0:
+            size = ks.max(axis = 0) + 1
+            if len(c) >= cls.DENSITY * np.prod(size):
+                dense = np.zeros(size)
+                dense[tuple(ks.T)] = c
+        return (c, ks, dense)
+
+    @classmethod
+    def _shift( cls, c, ks, e ):
+        '''Returns the polynomial with coefficients c and degrees ks - e,
+        keeping only the non-zero coefficients.'''
+        keep = c > 0
+        return cls._polynomial(c[keep], ks[keep] - e)
+
+    @classmethod
+    def from_array( cls, P ):
+        '''Builds the generating functions from a joint distribution held as
+        an L-dimensional array, P[k_1, ..., k_L], or for two layers as a
+        `scipy.sparse` matrix.
+        :param P: the joint distribution
+        :returns: the generating functions'''
+        if scipy.sparse.issparse(P):
+            P = P.tocoo()
+            return cls(np.column_stack([P.row, P.col]), P.data)
+        P = np.asarray(P, dtype=float)
+        ks = np.argwhere(P > 0)
+        return cls(ks, P[tuple(ks.T)])
+
+    @classmethod
+    def from_dict( cls, Pk ):
+        '''Builds the generating functions from a joint distribution stored
+        as a dictionary {(k_1, ..., k_L): P_k}.
+        :param Pk: the joint distribution
+        :returns: the generating functions'''
+        ks = np.array(list(Pk.keys()), dtype=np.int64)
+        return cls(ks, np.array(list(Pk.values()), dtype=float))
+
+    @classmethod
+    def independent( cls, *pks ):
+        '''Builds the generating functions of layers whose degrees are
+        independent, from the degree distribution array of each layer.
+        :param pks: an array of P_k for each layer
+        :returns: the generating functions'''
+        P = np.ones(())
+        for pk in pks:
+            P = np.multiply.outer(P, np.asarray(pk, dtype=float))
+        return cls.from_array(P)
+
+    def layers( self ):
+        '''Returns the number of layers L.'''
+        return self._ks.shape[1]
+
+    def average_degrees( self ):
+        '''Returns the array of mean degrees <k_l> in each layer.'''
+        return self._ave_k
+
+    def marginal( self, l ):
+        '''Returns the degree distribution of a single layer.
+        :param l: the layer
+        :returns: array of P_k for k = 0 to the largest degree in the layer'''
+        return np.bincount(self._ks[:, l], weights = self._ps)
+
+    def _evaluate( self, x, polynomial ):
+        '''Evaluates a polynomial at arguments of shape (..., L), in blocks
+        of at most `BLOCK` terms. A dense polynomial is contracted with the
+        powers of one argument at a time, the first as a matrix product; a
+        sparse one sums its terms, looking up the powers in a table.'''
+        (c, ks, dense) = polynomial
+        x = np.asarray(x, dtype=float)
+        shape = x.shape[:-1]
+        xs = x.reshape(-1, x.shape[-1])
+        values = np.zeros(len(xs))
+        if len(c) == 0:
+            return values.reshape(shape)
+
+        def powers( xb, l ):
+            return np.power.outer(xb[:, l], np.arange(ks[:, l].max() + 1))
+
+        if dense is not None:
+            b = max(1, self.BLOCK // dense.size)
+            for i in range(0, len(xs), b):
+                xb = xs[i:i + b]
+                y = np.dot(powers(xb, 0), dense.reshape(dense.shape[0], -1))
+                for l in range(1, ks.shape[1]):
+                    y = np.einsum('mkr,mk->mr', y.reshape(len(xb), dense.shape[l], -1), powers(xb, l))
+                values[i:i + b] = y[:, 0]
+        else:
+            b = max(1, self.BLOCK // len(c))
+            for i in range(0, len(xs), b):
+                xb = xs[i:i + b]
+                terms = np.ones((len(xb), len(c)))
+                for l in range(ks.shape[1]):
+                    terms *= powers(xb, l)[:, ks[:, l]]
+                values[i:i + b] = np.dot(terms, c)
+        return values.reshape(shape)
+
+    def G_0( self, x ):
+        '''Evaluates `G_0`.
+        :param x: arguments, array of shape (..., L)
+        :returns: array of shape (...)'''
+        return self._evaluate(x, self._G_0)
+
+    def G_0_gradient( self, x ):
+        '''Evaluates the derivatives of `G_0` with respect to each argument.
+        :param x: arguments, array of shape (..., L)
+        :returns: array of shape (..., L)'''
+        return np.stack([ self._evaluate(x, g) for g in self._gradient ], axis = -1)
+
+    def G_1( self, x ):
+        '''Evaluates `G_1` for each layer, the generating function of the
+        excess degrees of a node reached along an edge of that layer.
+        :param x: arguments, array of shape (..., L)
+        :returns: array of shape (..., L)'''
+        return self.G_0_gradient(x) / self._ave_k
+
+    def G_1_jacobian( self, x ):
+        '''Evaluates the derivatives of `G_1`, with element [l, m] the
+        derivative of `G_1` for layer l with respect to argument m.
+        :param x: arguments, array of shape (..., L)
+        :returns: array of shape (..., L, L)'''
+        J = np.stack([ np.stack([ self._evaluate(x, h) for h in row ], axis = -1)
+                       for row in self._hessian ], axis = -2)
+        return J / self._ave_k[:, np.newaxis]
@@ -21,15 +21,61 @@
 
 import networkx
 import epyc
+import numpy as np
+from network_processes.degrees import DegreeDistribution
+from network_processes.sparse import SparseNetwork, erdos_renyi_edges, configuration_model_edges
+from network_processes.distributions import poisson_pk, exponential_pk, power_law_pk
 
 
 class NETWORK( epyc.Experiment ):
     '''The base class for generating a network using networkx and
     defining basic analysis tools for later use. Each method will 
-    subclass this to model the desired process. '''
+    subclass this to model the desired process. 
+    
+    For large networks the prototype can instead be generated directly 
+    as a `SparseNetwork` by setting the `GENERATOR` parameter to 
+    `ERDOS_RENYI` or `CONFIGURATION`. The configuration model takes its 
+    degree sequence from `degree_sequence`, which subclasses may overide.
+    
+    Experiments that only need the degree distribution, such as `GFs`, `HMF`
+    and `EBCM`, can skip building a network altogether by setting `GENERATOR`
+    to one of the analytic distributions: `POISSON` or `EXPONENTIAL` with mean
+    `AVERAGE_K`, `POWER_LAW` with `EXPONENT` and an optional `CUTOFF`, or 
+    `DISTRIBUTION` with an array of probabilities `DEGREE_DISTRIBUTION`. The
+    first three are truncated at `K_MAX`. There is then no prototype network,
+    and `degree_probabilities`, which subclasses may overide, gives the 
+    distribution; subclasses can add generators of their own to 
+    `ANALYTIC_GENERATORS` and give their distributions there. Experiments that simulate over the network itself set
+    `NEEDS_NETWORK` to True, and refuse to run without one.
+    
+    By default every run works on its own copy of the prototype. Experiments
+    that never modify the network should set `SHARED` to True so that they
+    work on the prototype directly; experiments that remove edges can do so 
+    through a mask over `edge_array` rather than a copy.'''
     
     N = 'N' # order of the network
     AVERAGE_K = 'kmean' # average degree s
+    GENERATOR = 'generator' # how the prototype network is created
+    DEGREE_SEQUENCE = 'degree_sequence' # degree sequence for the configuration model
+    DEGREE_DISTRIBUTION = 'degree_distribution' # array of P_k for an analytic distribution
+    EXPONENT = 'exponent' # exponent of a power-law distribution
+    CUTOFF = 'cutoff' # scale of the exponential cutoff of a power-law distribution
+    K_MAX = 'k_max' # largest degree of an analytic distribution
+    
+    # network generators
+    NETWORKX = 'networkx' # networkx G(N, p) graph
+    ERDOS_RENYI = 'erdos_renyi' # sparse G(N, p) network
+    CONFIGURATION = 'configuration' # sparse configuration model network
+    
+    # analytic degree distributions, with no network
+    POISSON = 'poisson' # Poisson distribution
+    EXPONENTIAL = 'exponential' # exponential distribution
+    POWER_LAW = 'power_law' # power-law distribution with exponential cutoff
+    DISTRIBUTION = 'distribution' # given array of probabilities
+    ANALYTIC_GENERATORS = [POISSON, EXPONENTIAL, POWER_LAW, DISTRIBUTION] # generators without a network
+    
+    SHARED = False # True if runs may share the prototype rather than copy it
+    NEEDS_NETWORK = False # True if runs cannot work from the degree distribution alone
 
     def __init__(self):
         super(NETWORK, self).__init__()
@@ -40,45 +86,146 @@ class NETWORK( epyc.Experiment ):
         :param params: the experimental parameters'''
         epyc.Experiment.configure(self, params)
         
-        # create the prototype network
-        N = params[self.N]
-        kmean = params[self.AVERAGE_K] + 0.0
-        g = networkx.erdos_renyi_graph(N, kmean / N)
-        
-        # remove degree-zero nodes
-        ks = g.degree()
-        k0s = [ i for i in ks.keys() if ks[i] == 0 ]
-        g.remove_nodes_from(k0s)
-        
-        # remove self-loops
-        g.remove_edges_from(g.selfloop_edges())
+        generator = params.get(self.GENERATOR, self.NETWORKX)
+        if generator == self.NETWORKX:
+            # create the prototype network
+            N = params[self.N]
+            kmean = params[self.AVERAGE_K] + 0.0
+            g = networkx.erdos_renyi_graph(N, kmean / N)
+            
+            # remove degree-zero nodes
+            ks = g.degree()
+            k0s = [ i for i in ks.keys() if ks[i] == 0 ]
+            g.remove_nodes_from(k0s)
+            
+            # remove self-loops
+            g.remove_edges_from(g.selfloop_edges())
+            
+        elif generator == self.ERDOS_RENYI:
+            # create a sparse prototype, without self-loops or degree-zero nodes
+            N = params[self.N]
+            kmean = params[self.AVERAGE_K] + 0.0
+            es = erdos_renyi_edges(N, kmean / N)
+            g = SparseNetwork.from_edges(N, es).without_isolates()
+            
+        elif generator == self.CONFIGURATION:
+            # create a sparse prototype, dropping self-loops, multi-edges 
+            # and any nodes left with degree zero
+            ks = self.degree_sequence(params)
+            es = configuration_model_edges(ks)
+            g = SparseNetwork.from_edges(len(ks), es).without_isolates()
+            
+        elif generator in self.ANALYTIC_GENERATORS:
+            # no network, just its degree distribution
+            g = None
+            
+        else:
+            raise ValueError('Unknown network generator {g}'.format(g = generator))
         
         # store it for later
         self._prototype = g
         
+        # compute the degree distribution once for all repetitions
+        if g is None:
+            self._degrees = DegreeDistribution.from_pk(self.degree_probabilities(params))
+        else:
+            self._degrees = DegreeDistribution.from_network(g)
+        
+        # the edge array and sparse form are built on demand
+        self._edges = None
+        self._sparse = None
+        
+    def degree_sequence( self, params ):
+        '''Returns the degree sequence used to build a configuration
+        model prototype. By default this is the `DEGREE_SEQUENCE` parameter.
+        :param params: the experimental parameters
+        :returns: array of node degrees'''
+        return params[self.DEGREE_SEQUENCE]
+        
+    def degree_probabilities( self, params ):
+        '''Returns the degree distribution used in place of a network by the
+        analytic generators, as an array of P_k indexed by degree.
+        :param params: the experimental parameters
+        :returns: array of probabilities'''
+        generator = params[self.GENERATOR]
+        if generator == self.DISTRIBUTION:
+            return params[self.DEGREE_DISTRIBUTION]
+        
+        if generator == self.POWER_LAW:
+            exponent = params[self.EXPONENT]
+            cutoff = params.get(self.CUTOFF, None)
+            if self.K_MAX in params:
+                k_max = params[self.K_MAX]
+            elif cutoff is not None:
+                # where the cutoff has decayed below double precision
+                k_max = int(np.ceil(40 * cutoff))
+            else:
+                raise ValueError('A power law without a cutoff needs a maximum degree')
+            return power_law_pk(exponent, k_max, cutoff)
+        
+        # Poisson and exponential distributions, by default truncated far 
+        # into their tails
+        kmean = params[self.AVERAGE_K] + 0.0
+        if generator == self.POISSON:
+            k_max = params.get(self.K_MAX, int(np.ceil(kmean + 20 * np.sqrt(kmean) + 20)))
+            return poisson_pk(kmean, k_max)
+        k_max = params.get(self.K_MAX, int(np.ceil(40 * (kmean + 1))))
+        return exponential_pk(kmean, k_max)
+        
     def setUp( self, params ):
         '''Set up a working network for this run of the experiment.
         This is useful when performing lab experiments.
         :param params: the experimental parameters'''
         epyc.Experiment.setUp(self, params)
-        self._network = self._prototype.copy()
+        if self.NEEDS_NETWORK and self._prototype is None:
+            raise ValueError('There is no network for an analytic degree distribution')
+        if self.SHARED or self._prototype is None:
+            self._network = self._prototype
+        else:
+            self._network = self._prototype.copy()
 
     def tearDown( self ):
         '''Delete the current network.'''
         epyc.Experiment.tearDown(self)
         self._network = None
 
+    def edge_array( self ):
+        '''Returns the edges of the prototype network as an array of shape
+        (E, 2), with nodes identified by their position in `nodes()`. The
+        array is built once and reused for every run.
+        :returns: array of edges'''
+        if self._prototype is None:
+            raise ValueError('There is no network for an analytic degree distribution')
+        if self._edges is None:
+            g = self._prototype
+            if isinstance(g, SparseNetwork):
+                self._edges = g.edge_array()
+            else:
+                index = dict((n, i) for i, n in enumerate(g.nodes()))
+                es = [ (index[u], index[v]) for (u, v) in g.edges() ]
+                self._edges = np.array(es, dtype=np.int64).reshape(-1, 2)
+        return self._edges
+
+    def sparse_network( self ):
+        '''Returns the prototype network as a `SparseNetwork`, with nodes 
+        identified by their position in `nodes()` as in `edge_array`. The
+        conversion is done once and reused for every run.
+        :returns: the sparse network'''
+        if self._prototype is None:
+            raise ValueError('There is no network for an analytic degree distribution')
+        if self._sparse is None:
+            g = self._prototype
+            if isinstance(g, SparseNetwork):
+                self._sparse = g
+            else:
+                self._sparse = SparseNetwork.from_edges(g.order(), self.edge_array())
+        return self._sparse
+
     def degree_distribution( self, g ):
         '''Computes the degree distribution of the network and stores
         as a dictionary {degree: P_k}.
         :param g: the network'''
-        Pk = {}
-        order = g.order()
-        inv_order = 1./order
-        for node in g.nodes_iter():
-            k = g.degree(node)
-            Pk[k] = Pk.get(k,0) + inv_order
-        return Pk
+        return DegreeDistribution.from_network(g).as_dict()
     
     def average_degree( self, Pk ):
         '''Returns the average degree of the degree distribution Pk.
@@ -0,0 +1,116 @@
+# Parallel repetitions of experiments
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `NetworkProcesses`, for epidemic network 
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import epyc
+import numpy as np
+import multiprocessing
+
+
+# the task run by each worker process, inherited when it is forked
+_task = None
+
+def _initialise( task ):
+    '''Stores the task in a newly-forked worker.
+    :param task: function of no arguments'''
+    global _task
+    _task = task
+    
+def _seeded( state ):
+    '''Runs the task once with its own random stream.
+    :param state: seed for the random number generator
+    :returns: the result of the task'''
+    np.random.seed(state)
+    return _task()
+
+
+def random_states( n, seed = None ):
+    '''Returns seeds for n independent random streams, spawned from a 
+    `SeedSequence` so that they are reproducible given `seed`.
+    :param n: the number of streams
+    :param seed: entropy for the streams (defaults to fresh entropy)
+    :returns: a list of seeds for `np.random.seed`'''
+    return [ s.generate_state(4) for s in np.random.SeedSequence(seed).spawn(n) ]
+
+
+def seeded_imap( task, states, processes = None ):
+    '''Yields the results of running a task once for each seed, in order,
+    across a pool of worker processes. The pool is forked, so the workers
+    inherit the task and everything it refers to, such as a network, rather
+    than having it pickled. Each run seeds the global random number 
+    generator first.
+    :param task: function of no arguments
+    :param states: seeds for the random number generator, from `random_states`
+    :param processes: the number of worker processes (defaults to all cores)
+    :returns: an iterator over the results'''
+    if hasattr(multiprocessing, 'get_context'):
+        mp = multiprocessing.get_context('fork')
+    else:
+        mp = multiprocessing
+    pool = mp.Pool(processes, _initialise, (task,))
+    try:
+        for rc in pool.imap(_seeded, states, chunksize = 1):
+            yield rc
+    finally:
+        pool.close()
+        pool.join()
+
+
+class ParallelRepeatedExperiment( epyc.RepeatedExperiment ):
+    '''A drop-in replacement for `epyc.RepeatedExperiment` that runs the
+    repetitions across a pool of worker processes. The pool is forked after
+    the underlying experiment has been configured, so every worker shares the 
+    prototype network built in `configure` rather than building or copying its 
+    own. Each repetition seeds the global random number generator from its own 
+    stream spawned from a `SeedSequence`, so the repetitions are statistically
+    independent and reproducible given `seed`. The results are returned in the 
+    same format as `epyc.RepeatedExperiment`, so `lab.results()` is unchanged.
+    
+    :param ex: the underlying experiment
+    :param N: the number of repetitions to perform
+    :param processes: the number of worker processes (defaults to all cores)
+    :param seed: entropy for the random streams (defaults to fresh entropy)'''
+    
+    def __init__( self, ex, N, processes = None, seed = None ):
+        super(ParallelRepeatedExperiment, self).__init__(ex, N)
+        self._processes = processes
+        self._seed = seed
+        
+    def do( self, params ):
+        '''Perform the repetitions in parallel.
+        :param params: the parameters to the experiment
+        :returns: a list of result dicts'''
+        N = self.repetitions()
+        
+        # run the repetitions with independent random streams, in workers
+        # that inherit the configured experiment
+        states = random_states(N, self._seed)
+        rcs = list(seeded_imap(self.experiment().run, states, self._processes))
+        
+        # flatten the results and add the repetition information to their
+        # metadata, as `epyc.RepeatedExperiment` does
+        results = []
+        for (i, res) in enumerate(rcs):
+            if not isinstance(res, list):
+                res = [res]
+            for rc in res:
+                rc[epyc.Experiment.METADATA][self.I] = i
+                rc[epyc.Experiment.METADATA][self.REPETITIONS] = N
+            results.extend(res)
+        return results
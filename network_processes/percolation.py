@@ -19,15 +19,18 @@
 # You should have received a copy of the GNU General Public License
 # along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
 
-import epyc 
 from network_processes import *
 import numpy as np
-import networkx
 
 
 class PERCOLATION( NETWORK ):
     '''Base for conducting experimental percolation results on
-    networks. 
+    networks. The `MODE` parameter selects bond percolation (`BOND`, 
+    the default), in which edges are retained with probability `T`;
+    site percolation (`SITE`), in which nodes are retained with 
+    probability `OCCUPATION`, as when immunising a population; or both 
+    together (`SITE_BOND`). Removals are recorded in node and edge masks 
+    over the shared prototype network.
     
     :References:
     -------------
@@ -36,40 +39,72 @@ class PERCOLATION( NETWORK ):
        with heterogeneous infectivity and susceptibility'
     '''
     
-    T = 'T'
+    T = 'T' # probability an edge is retained
+    OCCUPATION = 'phi' # probability a node is retained
+    MODE = 'mode' # which elements are removed
+    
+    # percolation modes
+    BOND = 'bond' # remove edges
+    SITE = 'site' # remove nodes
+    SITE_BOND = 'site_bond' # remove nodes and edges
+    
+    SHARED = True # elements are removed through masks, not from the network
+    NEEDS_NETWORK = True # elements are removed from the network itself
     
     def __init__(self):
         super(PERCOLATION, self).__init__()
         
+    def setUp( self, params ):
+        '''Set up node and edge masks over the shared prototype network
+        in place of a working copy.
+        :param params: the experimental parameters'''
+        super(PERCOLATION, self).setUp(params)
+        self._node_mask = np.ones(self._network.order(), dtype=bool)
+        self._edge_mask = np.ones(len(self.edge_array()), dtype=bool)
+        
+    def tearDown( self ):
+        '''Delete the current masks.'''
+        super(PERCOLATION, self).tearDown()
+        self._node_mask = None
+        self._edge_mask = None
+        
     def do( self, params ):
         '''Here we perform a percolation experiment on the network g.
-        We remove nodes with a probability (1 - T) and return the 
+        We remove edges with a probability (1 - T) and/or nodes with
+        probability (1 - phi), depending on the mode, and return the 
         largest connected component in the resulting network.
         :param params: experimental parameters'''
         
         rc = dict() 
         
-        # grab a copy of the network
+        # grab the shared network and its edges
         g = self._network
+        es = self.edge_array()
         
-        # unpack required parameters 
-        T = params[self.T]
-        N = params[self.N]
+        # unpack required parameters, normalising by the prototype's size
+        N = g.order()
+        mode = params.get(self.MODE, self.BOND)
+        if mode not in [self.BOND, self.SITE, self.SITE_BOND]:
+            raise ValueError('Unknown percolation mode {m}'.format(m = mode))
         
-        # iterate over network nodes and remove with probability 1 - T_eff
-        es = []
-        for e in g.edges():
-            if np.random.random() < (1 - T):
-                # add edge e to ebunch
-                es.append(e)
+        if mode in [self.BOND, self.SITE_BOND]:
+            # retain each edge with probability T, drawn as one Bernoulli mask
+            T = params[self.T]
+            self._edge_mask &= np.random.random(len(es)) < T
+            
+        if mode in [self.SITE, self.SITE_BOND]:
+            # retain each node with probability phi, and only the edges 
+            # between retained nodes
+            phi = params[self.OCCUPATION]
+            self._node_mask &= np.random.random(g.order()) < phi
+            self._edge_mask &= self._node_mask[es[:, 0]] & self._node_mask[es[:, 1]]
                     
-        # remove edges in ebunch from network
-        g.remove_edges_from(es)
-        
-        # find the giant connected component of the network
-        gc = max(networkx.connected_component_subgraphs(g), key=len)
+        # find the giant connected component of the remaining nodes and edges
+        labels = component_labels(g.order(), es[self._edge_mask])
+        retained = labels[self._node_mask]
+        gc = np.bincount(retained).max() if len(retained) > 0 else 0
         
         # report the occupied fraction of the network
-        rc['occupied_fraction'] = (len(gc) + 0.0) / N
+        rc['occupied_fraction'] = float(gc) / N
         
         return rc
@@ -0,0 +1,114 @@
+# Percolation swept over a grid of transmissibilities
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `NetworkProcesses`, for epidemic network 
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import numpy as np
+from scipy.stats import binom
+
+
+class PERCOLATIONSweep( PERCOLATION ):
+    r'''Computes the occupied fraction as a function of `T` over a whole grid
+    of transmissibilities in one pass per realisation, using the algorithm of
+    Newman and Ziff [1]. The edges are added in a random order and the size 
+    `S_m` of the largest component is recorded after each of the `m` additions. 
+    Since each edge is retained independently with probability `T`, the 
+    occupied fraction is then the binomial convolution
+    
+     .. math::
+     
+         S(T) = \sum_{m=0}^E \binom{E}{m} T^m (1 - T)^{E - m} S_m / N
+    
+    The `MODE` parameter selects the process as in `PERCOLATION`. For `SITE`
+    percolation the nodes are occupied in a random order instead, and the grid 
+    is of occupation probabilities. For `SITE_BOND` percolation the nodes are 
+    first retained with probability `OCCUPATION` and the edges between the 
+    retained nodes are then swept over the grid of `T`.
+    
+    :References:
+    -------------
+    .. [1] M. E. J. Newman and R. M. Ziff. 'Fast Monte Carlo algorithm for 
+           site or bond percolation', Phys. Rev. E, vol. 64, p. 016706, 2001.'''
+    
+    T_MIN = 'T_min' # smallest transmissibility
+    T_MAX = 'T_max' # largest transmissibility
+    T_POINTS = 'T_points' # number of transmissibilities in the grid
+    
+    def __init__(self):
+        super(PERCOLATIONSweep, self).__init__()
+        
+    def convolve( self, sizes, Ts ):
+        '''Convolves the largest component sizes after each edge addition 
+        with the binomial distribution of the number of retained edges. Only
+        the terms within ten standard deviations of the mean are summed.
+        :param sizes: array of E + 1 largest component sizes
+        :param Ts: array of transmissibilities
+        :returns: array of expected largest component sizes'''
+        E = len(sizes) - 1
+        S = np.empty(len(Ts))
+        for i, T in enumerate(Ts):
+            width = 10 * np.sqrt(E * T * (1 - T)) + 1
+            lo = int(max(0, np.floor(E * T - width)))
+            hi = int(min(E, np.ceil(E * T + width)))
+            ms = np.arange(lo, hi + 1)
+            S[i] = np.dot(binom.pmf(ms, E, T), sizes[lo:hi + 1])
+        return S
+        
+    def do( self, params ):
+        '''Adds the network's edges in a random order, recording the size of 
+        the largest component, and convolves the result over the grid of `T`.
+        :param params: experimental parameters'''
+        Ts = np.linspace(params[self.T_MIN], params[self.T_MAX], params[self.T_POINTS])
+        
+        rc = dict()
+        
+        mode = params.get(self.MODE, self.BOND)
+        
+        # grab the shared network and its edges, normalising by its size
+        g = self._network
+        es = self.edge_array()
+        N = g.order()
+        
+        if mode == self.BOND:
+            # a single pass adding the edges in a random order
+            order = np.random.permutation(len(es))
+            sizes = largest_component_sizes(g.order(), es[order])
+            
+        elif mode == self.SITE:
+            # a single pass occupying the nodes in a random order
+            order = np.random.permutation(g.order())
+            sizes = largest_site_component_sizes(self.sparse_network(), order)
+            
+        elif mode == self.SITE_BOND:
+            # retain the nodes, then add the edges between them in a random order
+            phi = params[self.OCCUPATION]
+            self._node_mask &= np.random.random(g.order()) < phi
+            self._edge_mask &= self._node_mask[es[:, 0]] & self._node_mask[es[:, 1]]
+            kept = es[self._edge_mask]
+            order = np.random.permutation(len(kept))
+            sizes = largest_component_sizes(g.order(), kept[order])
+            
+        else:
+            raise ValueError('Unknown percolation mode {m}'.format(m = mode))
+        
+        # report the occupied fraction over the grid
+        rc['T'] = Ts
+        rc['occupied_fraction'] = self.convolve(sizes, Ts) / N
+        
+        return rc
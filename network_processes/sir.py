@@ -0,0 +1,162 @@
+# Event-driven SIR simulation over a network
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import numpy as np
+import heapq
+
+class SIR( NETWORK ):
+    '''Exact event-driven simulation of an SIR process over the network
+    itself, rather than over its degree classes as in `STO`. Every node is
+    seeded as infected with probability `pInfected`. When a node is infected
+    its recovery time is fixed, and an infection event is scheduled in a
+    priority queue for each neighbour that it would infect first, before it
+    recovers [1]. Each node is infected at most once and each edge is
+    examined at most once, so a realisation costs O((N + E) log N) time on
+    the compressed sparse row form of the prototype network.
+
+    The delays are drawn by `transmission_times` and `recovery_times`, which
+    by default give a Markovian process with rates `pInfect` per edge and
+    `pRecover` per node, as in `HMF` and `STO`. Override these to simulate
+    a non-Markovian process.
+
+    The final numbers of susceptible, infected and recovered nodes are
+    reported as `final_state`, and the time at which the last node recovered
+    as `stop_time`. If the `TIMES` parameter is given the numbers at each of
+    those times are reported as `trajectory`, found from the infection and
+    recovery times of the nodes.
+
+    :References:
+    -------------
+    .. [1] I. Z. Kiss, J. C. Miller and P. L. Simon. 'Mathematics of Epidemics
+           on Networks', Springer, 2017, Appendix A.'''
+
+    TIMES = 'times' # times at which to report the trajectory
+
+    SHARED = True # the network is never modified
+    NEEDS_NETWORK = True # the process runs over the network itself
+
+    def __init__(self):
+        super(SIR, self).__init__()
+
+    def transmission_times( self, params, n ):
+        '''Draws the delays between the infection of a node and it infecting
+        a neighbour, if it has not recovered first.
+        :param params: the experimental parameters
+        :param n: the number of delays
+        :returns: array of delays'''
+        return np.random.exponential(1.0 / params['pInfect'], n)
+
+    def recovery_times( self, params, n ):
+        '''Draws the times for which nodes stay infected.
+        :param params: the experimental parameters
+        :param n: the number of times
+        :returns: array of times'''
+        return np.random.exponential(1.0 / params['pRecover'], n)
+
+    def initialisation( self, params, N ):
+        '''Chooses the initially-infected nodes, each with probability
+        `pInfected`. At least one node is always infected.
+        :param params: the experimental parameters
+        :param N: the number of nodes
+        :returns: array of nodes'''
+        seeds = np.flatnonzero(np.random.random(N) < params['pInfected'])
+        if len(seeds) == 0:
+            seeds = np.array([ np.random.randint(N) ])
+        return seeds
+
+    def simulate( self, params, g, seeds ):
+        '''Simulates the process from the given seeds. All the transmission
+        delays are drawn at once, one for each direction of each edge, and
+        only infections that would happen before both the recovery of the
+        infecting node and any infection of the neighbour already scheduled
+        are added to the queue.
+        :param params: the experimental parameters
+        :param g: the network, a `SparseNetwork`
+        :param seeds: array of initially-infected nodes
+        :returns: arrays of the infection and recovery times of every node,
+        infinite for nodes never infected'''
+        N = g.order()
+        indptr = g.indptr()
+        indices = g.indices()
+
+        # draw all the delays up front
+        recovery = self.recovery_times(params, N)
+        delays = self.transmission_times(params, len(indices))
+
+        infected = np.full(N, np.inf)
+        recovered = np.full(N, np.inf)
+
+        # the earliest time each node is scheduled to be infected
+        scheduled = np.full(N, np.inf)
+        scheduled[seeds] = 0.0
+        queue = [ (0.0, s) for s in seeds.tolist() ]
+        heapq.heapify(queue)
+
+        while len(queue) > 0:
+            t, u = heapq.heappop(queue)
+            if t > scheduled[u]:
+                # superseded by an earlier infection
+                continue
+
+            # infect the node and fix when it recovers
+            infected[u] = t
+            recovered[u] = t + recovery[u]
+
+            # schedule infections of neighbours that would happen first
+            a, b = indptr[u], indptr[u + 1]
+            vs = indices[a:b]
+            ts = t + delays[a:b]
+            first = (ts < recovered[u]) & (ts < scheduled[vs])
+            scheduled[vs[first]] = ts[first]
+            for (tv, v) in zip(ts[first].tolist(), vs[first].tolist()):
+                heapq.heappush(queue, (tv, v))
+
+        return infected, recovered
+
+    def do( self, params ):
+        '''Performs a single realisation of the process.
+        :param params: the experimental parameters'''
+        rc = dict()
+
+        # grab the shared network in compressed sparse row form
+        g = self.sparse_network()
+        N = g.order()
+
+        seeds = self.initialisation(params, N)
+        infected, recovered = self.simulate(params, g, seeds)
+
+        # report the final state and when the epidemic ended
+        R = np.count_nonzero(np.isfinite(infected))
+        rc['final_state'] = np.array([N - R, 0, R])
+        rc['stop_time'] = recovered[np.isfinite(recovered)].max()
+
+        # report the numbers in each state at the requested times
+        times = params.get(self.TIMES, None)
+        if times is not None:
+            times = np.asarray(times, dtype=float)
+            ever_infected = np.searchsorted(np.sort(infected), times, side = 'right')
+            ever_recovered = np.searchsorted(np.sort(recovered), times, side = 'right')
+            rc['times'] = times
+            rc['trajectory'] = np.column_stack([N - ever_infected,
+                                                ever_infected - ever_recovered,
+                                                ever_recovered])
+
+        return rc
@@ -0,0 +1,191 @@
+# Sparse array-backed networks and generators
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+import networkx
+
+
+class SparseNetwork( object ):
+    '''A simple undirected network stored as a compressed sparse row (CSR)
+    adjacency structure: the neighbours of node `i` are
+    `indices[indptr[i]:indptr[i + 1]]`. Nodes are labelled 0 to N-1. This
+    is far more compact than a networkx graph for networks with millions
+    of nodes. The class provides the parts of the networkx interface used
+    by the experiments, and can be converted to a networkx graph on demand
+    using `to_networkx`.
+
+    :param indptr: array of N + 1 row offsets
+    :param indices: array of neighbours, two entries per edge'''
+
+    def __init__( self, indptr, indices ):
+        self._indptr = np.asarray(indptr, dtype=np.int64)
+        self._indices = np.asarray(indices, dtype=np.int64)
+
+    @classmethod
+    def from_edges( cls, N, edges ):
+        '''Builds a simple network from an array of edges, discarding
+        self-loops and multi-edges.
+        :param N: the number of nodes
+        :param edges: array of shape (E, 2) of node pairs
+        :returns: the network'''
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+
+        # order each pair, drop self-loops and duplicates
+        u = np.minimum(edges[:, 0], edges[:, 1])
+        v = np.maximum(edges[:, 0], edges[:, 1])
+        keep = u != v
+        key = np.unique(u[keep] * N + v[keep])
+        u, v = key // N, key % N
+
+        # add both directions and sort by source node
+        src = np.concatenate([u, v])
+        dst = np.concatenate([v, u])
+        order = np.argsort(src, kind = 'mergesort')
+        indptr = np.zeros(N + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength = N), out = indptr[1:])
+        return cls(indptr, dst[order])
+
+    def without_isolates( self ):
+        '''Returns a copy of the network with the degree-zero nodes removed
+        and the remaining nodes relabelled consecutively.'''
+        ks = self.degrees()
+        keep = ks > 0
+        relabel = np.cumsum(keep) - 1
+        indptr = np.zeros(np.count_nonzero(keep) + 1, dtype=np.int64)
+        np.cumsum(ks[keep], out = indptr[1:])
+        return SparseNetwork(indptr, relabel[self._indices])
+
+    def copy( self ):
+        '''Returns a copy of the network.'''
+        return SparseNetwork(self._indptr.copy(), self._indices.copy())
+
+    def indptr( self ):
+        '''Returns the CSR row offsets.'''
+        return self._indptr
+
+    def indices( self ):
+        '''Returns the CSR neighbour array.'''
+        return self._indices
+
+    def order( self ):
+        '''Returns the number of nodes.'''
+        return len(self._indptr) - 1
+
+    def __len__( self ):
+        return self.order()
+
+    def number_of_edges( self ):
+        '''Returns the number of edges.'''
+        return len(self._indices) // 2
+
+    def degrees( self ):
+        '''Returns the array of node degrees.'''
+        return np.diff(self._indptr)
+
+    def degree( self, node ):
+        '''Returns the degree of a node.
+        :param node: the node'''
+        return int(self._indptr[node + 1] - self._indptr[node])
+
+    def nodes( self ):
+        '''Returns the list of nodes.'''
+        return list(range(self.order()))
+
+    def nodes_iter( self ):
+        '''Returns an iterator over the nodes.'''
+        return iter(range(self.order()))
+
+    def neighbors( self, node ):
+        '''Returns the array of neighbours of a node.
+        :param node: the node'''
+        return self._indices[self._indptr[node]:self._indptr[node + 1]]
+
+    def edge_array( self ):
+        '''Returns every edge once as an array of shape (E, 2) with the
+        smaller node label first.'''
+        src = np.repeat(np.arange(self.order(), dtype=np.int64), self.degrees())
+        upper = src < self._indices
+        return np.column_stack([src[upper], self._indices[upper]])
+
+    def edges( self ):
+        '''Returns the list of edges as node pairs.'''
+        return [ tuple(e) for e in self.edge_array().tolist() ]
+
+    def to_networkx( self ):
+        '''Returns the network as a networkx graph.'''
+        g = networkx.Graph()
+        g.add_nodes_from(range(self.order()))
+        g.add_edges_from(self.edge_array().tolist())
+        return g
+
+
+def erdos_renyi_edges( N, p ):
+    '''Generates the edges of a G(N, p) random graph in O(N + E) time by
+    drawing the geometrically-distributed gaps between successive edges
+    in the list of all N(N - 1)/2 node pairs [1]. Pair `i` in that list is
+    the pair (v, w) with w < v and i = v(v - 1)/2 + w.
+
+    :param N: the number of nodes
+    :param p: the edge probability
+    :returns: array of shape (E, 2) of edges
+
+    :References:
+    -------------
+    .. [1] V. Batagelj and U. Brandes. 'Efficient generation of large
+           random networks', Phys. Rev. E, vol. 71, p. 036113, 2005.'''
+    M = N * (N - 1) // 2
+    if p <= 0 or M == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    if p >= 1:
+        pairs = np.arange(M, dtype=np.int64)
+    else:
+        # draw the gaps in batches until we pass the last pair
+        mean = M * p
+        batch = int(mean + 5 * np.sqrt(mean) + 10)
+        chunks = []
+        last = -1
+        while last < M:
+            pairs = last + np.cumsum(np.random.geometric(p, size = batch))
+            chunks.append(pairs)
+            last = pairs[-1]
+        pairs = np.concatenate(chunks)
+        pairs = pairs[pairs < M]
+
+    # map linear pair indices back to (v, w)
+    v = ((1 + np.sqrt(1 + 8 * pairs.astype(float))) / 2).astype(np.int64)
+    v -= (v * (v - 1) // 2) > pairs
+    v += ((v + 1) * v // 2) <= pairs
+    w = pairs - v * (v - 1) // 2
+    return np.column_stack([v, w])
+
+
+def configuration_model_edges( degrees ):
+    '''Generates the edges of a configuration model network by randomly
+    matching the stubs of a degree sequence. The result may contain
+    self-loops and multi-edges, which `SparseNetwork.from_edges` removes.
+
+    :param degrees: the degree sequence, with an even sum
+    :returns: array of shape (E, 2) of edges'''
+    degrees = np.asarray(degrees, dtype=np.int64)
+    if degrees.sum() % 2 != 0:
+        raise ValueError('Degree sequence must have an even sum')
+    stubs = np.repeat(np.arange(len(degrees), dtype=np.int64), degrees)
+    np.random.shuffle(stubs)
+    return stubs.reshape(-1, 2)
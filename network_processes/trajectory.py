@@ -0,0 +1,128 @@
+# Chunked integration of ODE systems for streaming trajectories
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `NetworkProcesses`, for epidemic network
+# analytical results using Python.
+#
+# `NetworkProcesses` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `NetworkProcesses` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `NetworkProcesses`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+import numpy as np
+import scipy.integrate
+from scipy.optimize import brentq
+
+
+def integrate_chunks( fun, y0, times, method = 'RK45', buffer_size = None, t0 = None, events = None, **options ):
+    '''Integrates the system dy/dt = fun(t, y) from `t0` and yields the
+    solution at the requested times in chunks of at most `buffer_size`
+    points. The integrator is stepped directly, and each step's dense
+    output is evaluated at the requested times it covers, so the whole
+    trajectory is never held in memory and the integration is never
+    restarted between chunks.
+
+    The integration stops early at the first zero of any of the `events`
+    functions, which take the same form as for `scipy.integrate.solve_ivp`
+    and are all treated as terminal, respecting their `direction`. The
+    requested times before the event are reported, followed by the time
+    of the event itself, so the last point yielded is always the state at
+    which the integration stopped.
+
+    :param fun: the right-hand side, fun(t, y)
+    :param y0: the initial state
+    :param times: increasing array of times at which to report the state
+    :param method: the name of a `scipy.integrate` ODE solver class
+    :param buffer_size: the maximum number of points per chunk (defaults to all)
+    :param t0: the initial time (defaults to the first requested time)
+    :param events: list of event functions, event(t, y)
+    :param options: further options passed to the solver
+    :returns: a generator of (ts, ys) pairs, with ys of shape (len(ts), len(y0))'''
+    times = np.asarray(times, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    if len(times) == 0:
+        return
+    if t0 is None:
+        t0 = times[0]
+    if times[0] < t0 or np.any(np.diff(times) < 0):
+        raise ValueError('Times must be increasing and not before the initial time')
+    if buffer_size is None:
+        buffer_size = len(times) + 1
+    if buffer_size < 1:
+        raise ValueError('Buffer size must be positive')
+    if events is None:
+        events = []
+
+    ts = np.empty(buffer_size)
+    ys = np.empty((buffer_size, len(y0)))
+    n = 0
+    i = 0
+
+    # report the initial state at any requested times equal to t0
+    while i < len(times) and times[i] == t0:
+        ts[n] = t0
+        ys[n] = y0
+        n += 1
+        i += 1
+        if n == buffer_size:
+            yield ts.copy(), ys.copy()
+            n = 0
+
+    if i < len(times):
+        solver = getattr(scipy.integrate, method)(fun, t0, y0, times[-1], **options)
+        g = np.array([ event(t0, y0) for event in events ])
+    while i < len(times):
+        t_old = solver.t
+        message = solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError(message)
+        sol = solver.dense_output()
+
+        # look for the earliest event in this step
+        t_stop = None
+        g_old, g = g, np.array([ event(solver.t, solver.y) for event in events ])
+        for (event, a, b) in zip(events, g_old, g):
+            direction = getattr(event, 'direction', 0)
+            if (a <= 0 <= b and direction >= 0) or (a >= 0 >= b and direction <= 0):
+                if b == 0:
+                    t_event = solver.t
+                else:
+                    t_event = brentq(lambda s: event(s, sol(s)), t_old, solver.t)
+                if t_stop is None or t_event < t_stop:
+                    t_stop = t_event
+
+        # requested times covered by this step, and the event if there was one
+        if t_stop is None:
+            j = np.searchsorted(times, solver.t, side = 'right')
+            points = times[i:j]
+        else:
+            j = np.searchsorted(times, t_stop, side = 'left')
+            points = np.append(times[i:j], t_stop)
+        i = j
+
+        # store the points in pieces that fit the buffer
+        l = 0
+        while l < len(points):
+            m = min(len(points), l + buffer_size - n)
+            ts[n:n + m - l] = points[l:m]
+            ys[n:n + m - l] = sol(points[l:m]).T
+            n += m - l
+            l = m
+            if n == buffer_size:
+                yield ts.copy(), ys.copy()
+                n = 0
+        if t_stop is not None:
+            break
+
+    # report whatever is left in the buffer
+    if n > 0:
+        yield ts[:n].copy(), ys[:n].copy()
@@ -20,28 +20,58 @@
 
 import unittest
 from .test_network import *
+from .test_sparse import *
 from .test_percolation import *
+from .test_percolation_sweep import *
+from .test_components import *
+from .test_fenwick import *
+from .test_ensemble import *
 from .test_gfs import *
+from .test_gfs_sweep import *
+from .test_gfs_overlay import *
 from .test_sto import *
+from .test_sir import *
 from .test_hmf import *
+from .test_ebcm import *
 from .test_add_del import *
+from .test_parallel import *
 
 
 # initialise the tests
 networkSuite = unittest.TestLoader().loadTestsFromTestCase(NetworkTest)
+sparseSuite = unittest.TestLoader().loadTestsFromTestCase(SparseNetworkTest)
 gfsSuite = unittest.TestLoader().loadTestsFromTestCase(GFsTest)
+gfsSweepSuite = unittest.TestLoader().loadTestsFromTestCase(GFsSweepTest)
+gfsOverlaySuite = unittest.TestLoader().loadTestsFromTestCase(GFsOverlayTest)
 percolationSuite = unittest.TestLoader().loadTestsFromTestCase(PercolationTest)
+percolationSweepSuite = unittest.TestLoader().loadTestsFromTestCase(PercolationSweepTest)
+componentsSuite = unittest.TestLoader().loadTestsFromTestCase(ComponentsTest)
+fenwickSuite = unittest.TestLoader().loadTestsFromTestCase(FenwickTreeTest)
+ensembleSuite = unittest.TestLoader().loadTestsFromTestCase(EnsembleStatisticsTest)
 stoSuite = unittest.TestLoader().loadTestsFromTestCase(STOTest)
+sirSuite = unittest.TestLoader().loadTestsFromTestCase(SIRTest)
 hmfSuite = unittest.TestLoader().loadTestsFromTestCase(HMFTest)
+ebcmSuite = unittest.TestLoader().loadTestsFromTestCase(EBCMTest)
 addition_deletionSuite = unittest.TestLoader().loadTestsFromTestCase(addition_deletionTest)
+parallelSuite = unittest.TestLoader().loadTestsFromTestCase(ParallelTest)
 
 # add tests to the test suite
 suite = unittest.TestSuite([ networkSuite,
+							 sparseSuite,
 							 gfsSuite,
+							 gfsSweepSuite,
+							 gfsOverlaySuite,
 							 percolationSuite,
+							 percolationSweepSuite,
+							 componentsSuite,
+							 fenwickSuite,
+							 ensembleSuite,
 							 stoSuite,
+							 sirSuite,
 							 hmfSuite,
-							 addition_deletionSuite ] )
+							 ebcmSuite,
+							 addition_deletionSuite,
+							 parallelSuite ] )
 
 # run the tests
 if __name__ == '__main__':
@@ -20,6 +20,8 @@
 
 from network_processes import *
 import unittest
+import epyc
+import numpy
 
 class addition_deletionTest(unittest.TestCase):
     '''Tests for `addition_deletion` class in `add_del.py` using an
@@ -42,7 +44,7 @@ class addition_deletionTest(unittest.TestCase):
         self._repetitions = 1              # repetitions at each point in the parameter space
     
     def testDegreeDist( self ):
-        ''''Test for a non-zero degree distribution for 
+        '''Test for a non-zero degree distribution for 
         steady-state network dynamics.'''
         # instance class
         e = addition_deletion()
@@ -53,4 +55,67 @@ class addition_deletionTest(unittest.TestCase):
         
         # perform tests
         self.assertTrue(sum(rc[epyc.Experiment.RESULTS]['sol']) > 0)
-
+        
+    def testJacobian( self ):
+        '''Test the analytic Jacobian against finite differences of `dpdt`.'''
+        e = addition_deletion()
+        e._POISSON = False
+        e._DELTA = True
+        k_max, n, c = 12, 2, 5
+        p = numpy.random.random(k_max * n)
+        dp = numpy.array(e.dpdt(p, 0, k_max, n, c))
+        
+        # finite difference approximation, one column at a time
+        h = 1e-6
+        J = numpy.zeros((k_max * n, k_max * n))
+        for i in range(k_max * n):
+            q = p.copy()
+            q[i] += h
+            J[:, i] = (numpy.array(e.dpdt(q, 0, k_max, n, c)) - dp) / h
+        
+        # perform tests
+        self.assertTrue(numpy.allclose(e.jacobian(k_max, n, c).toarray(), J, atol = 1e-5))
+        
+        # the packed band holds the same diagonals
+        packed = e.banded_jacobian(k_max, n, c)
+        self.assertEqual(packed.shape, (2 * n + 1, k_max * n))
+        for d in range(-n, n + 1):
+            self.assertTrue(numpy.allclose(packed[n - d, max(d, 0):k_max * n + min(d, 0)], numpy.diag(J, d), atol = 1e-5))
+        
+    def testPhiLargeDegree( self ):
+        '''Test that the Poisson phi_k does not overflow for large k_max.'''
+        e = addition_deletion()
+        e._POISSON = True
+        e._DELTA = False
+        k_max, n, c = 2000, 1, 50
+        phi = e.phi_k(c, k_max)
+        dp = e.dpdt(numpy.zeros(k_max * n), 0, k_max, n, c, phi)
+        
+        # perform tests
+        self.assertTrue(numpy.all(numpy.isfinite(phi)))
+        self.assertAlmostEqual(phi.sum(), 1.0)
+        self.assertTrue(numpy.allclose(dp, phi))
+        
+    def testTrajectory( self ):
+        '''Test the trajectory is streamed in chunks and ends at the final state.'''
+        params = dict(time = numpy.linspace(0, 10, 41), N = 2000, kmean = 5,
+                      k_max = 30, class_dimension = 1, poisson = False, delta = True)
+        params[addition_deletion.GENERATOR] = addition_deletion.ERDOS_RENYI
+        params[addition_deletion.AVERAGE_K] = 5
+        e = addition_deletion()
+        e.configure(params)
+        e.setUp(params)
+        rc = e.do(params)
+        
+        # stream the trajectory, recording the chunk sizes
+        chunks = []
+        e.trajectory_chunk = lambda params, ts, ps: chunks.append(len(ts))
+        params[addition_deletion.TRAJECTORY] = True
+        params[addition_deletion.BUFFER_SIZE] = 10
+        rc_streamed = e.do(params)
+        e.tearDown()
+        
+        # perform tests
+        self.assertEqual(chunks, [10, 10, 10, 10, 1])
+        self.assertTrue('trajectory' not in rc_streamed)
+        self.assertTrue(numpy.allclose(rc['sol'], rc_streamed['sol'], atol = 1e-6))
@@ -0,0 +1,45 @@
+# test components for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+
+class ComponentsTest( unittest.TestCase ):
+    '''Test class for the component engine in `components.py`.'''
+    
+    def testComponentSizes( self ):
+        '''Test component sizes for a small network with an isolated node.'''
+        es = [[0, 1], [1, 2], [3, 4]]
+        self.assertEqual(sorted(component_sizes(6, es).tolist()), [1, 2, 3])
+        
+        # assert nodes of the same component share a label
+        labels = component_labels(6, es)
+        self.assertEqual(labels[0], labels[2])
+        self.assertNotEqual(labels[0], labels[3])
+        
+    def testLargestComponentSizes( self ):
+        '''Test the largest component is tracked as edges are added.'''
+        es = [[0, 1], [2, 3], [1, 2], [0, 3], [4, 5]]
+        self.assertEqual(largest_component_sizes(6, es).tolist(), [1, 2, 2, 4, 4, 4])
+        
+    def testLargestSiteComponentSizes( self ):
+        '''Test the largest component is tracked as nodes are occupied.'''
+        g = SparseNetwork.from_edges(5, [[0, 1], [1, 2], [3, 4]])
+        self.assertEqual(largest_site_component_sizes(g, [0, 2, 3, 1, 4]).tolist(), [0, 1, 1, 1, 3, 3])
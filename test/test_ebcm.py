@@ -0,0 +1,67 @@
+# test ebcm for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import numpy
+
+class EBCMTest(unittest.TestCase):
+	'''Tests for `EBCM` class in `ebcm.py`. '''
+	
+	def setUp( self ):
+		'''Set up the parameters.'''
+		self._params = {EBCM.N: 2000,
+						EBCM.AVERAGE_K: 5,
+						EBCM.GENERATOR: EBCM.ERDOS_RENYI,
+						EBCM.HORIZON: 400,
+						'pInfected': 1e-6,
+						'pInfect': 0.4,
+						'pRecover': 0.5}
+		
+	def run_ebcm( self, params ):
+		'''Run a single EBCM experiment and return the experiment and its results.'''
+		e = EBCM()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		return e, rc
+	
+	def testFinalSize( self ):
+		'''Test the final size agrees with generating functions.'''
+		e, rc = self.run_ebcm(self._params)
+		gf = e._degrees.generating_function()
+		T = 0.4 / 0.9
+		(u, iterations, residual) = GFs().solve(gf, T, GFs.NEWTON)
+		# perform tests
+		self.assertAlmostEqual(rc['final_state'][2], GFs().outbreak_size(gf, T, u), places = 4)
+		self.assertAlmostEqual(rc['theta'], 1 - T * u, places = 4)
+		
+	def testTrajectory( self ):
+		'''Test the trajectory conserves the population and ends at the final state.'''
+		params = dict(self._params)
+		params['pInfected'] = 0.01
+		params[EBCM.TIMES] = numpy.linspace(0, 400, 41)
+		e, rc = self.run_ebcm(params)
+		# perform tests
+		self.assertTrue(numpy.allclose(rc['trajectory'][0], [0.99, 0.01, 0.0]))
+		self.assertTrue(numpy.allclose(rc['trajectory'].sum(axis = 1), 1.0))
+		self.assertTrue(numpy.allclose(rc['trajectory'][-1], rc['final_state']))
+		self.assertTrue((numpy.diff(rc['trajectory'][:, 2]) > -1e-7).all())
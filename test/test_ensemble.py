@@ -0,0 +1,50 @@
+# test ensemble for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import numpy
+
+class EnsembleStatisticsTest( unittest.TestCase ):
+    '''Test class for the streaming statistics in `ensemble.py`.'''
+    
+    def testStatistics( self ):
+        '''Test the streaming statistics match those of all the realisations.'''
+        xs = numpy.random.randint(0, 50, (101, 3))
+        s = EnsembleStatistics()
+        for x in xs:
+            s.add(x)
+        
+        # assert the statistics match numpy's
+        self.assertEqual(s.size(), 101)
+        self.assertTrue(numpy.allclose(s.mean(), xs.mean(axis = 0)))
+        self.assertTrue(numpy.allclose(s.variance(), xs.var(axis = 0, ddof = 1)))
+        self.assertEqual(s.quantiles([0, 0.5, 1]).tolist(), 
+                         [xs.min(axis = 0).tolist(), 
+                          numpy.sort(xs, axis = 0)[50].tolist(), 
+                          xs.max(axis = 0).tolist()])
+        
+    def testCounts( self ):
+        '''Test realisations must be non-negative integer counts.'''
+        s = EnsembleStatistics()
+        with self.assertRaises(ValueError):
+            s.add([1.5, 2])
+        with self.assertRaises(ValueError):
+            s.add([-1, 2])
@@ -0,0 +1,44 @@
+# test fenwick for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import numpy
+
+class FenwickTreeTest( unittest.TestCase ):
+    '''Test class for the Fenwick tree in `fenwick.py`.'''
+    
+    def testPrefixSums( self ):
+        '''Test prefix sums are kept as weights are changed.'''
+        ws = numpy.random.randint(0, 10, 37)
+        f = FenwickTree(ws.tolist())
+        for i in numpy.random.randint(0, 37, 50):
+            d = numpy.random.randint(0, 5)
+            ws[i] += d
+            f.add(i, d)
+        
+        # assert the sums match a cumulative sum
+        self.assertEqual([ f.prefix(i) for i in range(38) ], [0] + numpy.cumsum(ws).tolist())
+        self.assertEqual(f.total(), ws.sum())
+        
+    def testFind( self ):
+        '''Test selection skips zero weights and falls in the right element.'''
+        f = FenwickTree([0, 3, 0, 0, 2, 1])
+        self.assertEqual([ f.find(u) for u in [0, 2.9, 3, 4.5, 5, 5.9] ], [1, 1, 4, 4, 5, 5])
@@ -21,6 +21,7 @@
 from network_processes import *
 import unittest
 import epyc
+import numpy
 
 class GFsTest(unittest.TestCase):
 	'''Tests for `GFs` class in `gfs.py` using an
@@ -39,7 +40,7 @@ class GFsTest(unittest.TestCase):
 		self._repetitions = 1
 
 	def testEpidemic( self ):
-		''''Test an epidemic occurs.'''
+		'''Test an epidemic occurs.'''
 		# instance class
 		e = GFs()
 		# perform the experiments
@@ -50,3 +51,84 @@ class GFsTest(unittest.TestCase):
 		self.assertTrue(rc[epyc.Experiment.RESULTS]['S1'] > 0)
 
 
+	def testGeneratingFunction( self ):
+		'''Test the vectorised generating functions agree with the
+		dictionary-based ones and are normalised.'''
+		Pk = {0: 0.1, 1: 0.2, 2: 0.3, 5: 0.4}
+		e = GFs()
+		ave_k = e.average_degree(Pk)
+		gf = GeneratingFunction.from_dict(Pk)
+		xs = numpy.linspace(0, 1, 11)
+		# compare to the reference implementation point by point
+		G_0s = [e.G_0_generating_function(Pk, ave_k, x) for x in xs]
+		G_1s = [e.G_1_generating_function(Pk, ave_k, x) for x in xs]
+		self.assertTrue(numpy.allclose(gf.G_0(xs), G_0s))
+		self.assertTrue(numpy.allclose(gf.G_1(xs), G_1s))
+		# check normalisation and the derivative at unity
+		self.assertAlmostEqual(gf.G_0(1.0), 1.0)
+		self.assertAlmostEqual(gf.G_1(1.0), 1.0)
+		self.assertAlmostEqual(gf.G_0_prime(1.0), ave_k)
+
+	def testSolvers( self ):
+		'''Test the convergence-aware solvers agree with direct iteration
+		and report their iterations and residuals.'''
+		Pk = {1: 0.2, 2: 0.3, 3: 0.2, 6: 0.3}
+		gf = GeneratingFunction.from_dict(Pk)
+		e = GFs()
+		Ts = numpy.array([0.1, 0.5, 0.9])
+		u, its, res = e.solve(gf, Ts, GFs.ITERATE)
+		for solver in [GFs.FIXED_POINT, GFs.NEWTON]:
+			v, vits, vres = e.solve(gf, Ts, solver, tolerance = 1e-12)
+			self.assertTrue(numpy.allclose(u, v, atol = 1e-8))
+			self.assertTrue((vits < its).all())
+			self.assertTrue((vres < 1e-8).all())
+	
+	def testAnalyticDistribution( self ):
+		'''Test a Poisson distribution gives the classical epidemic size, 
+		S = 1 - exp(-<k> T S), without building a network.'''
+		params = {GFs.GENERATOR: GFs.POISSON,
+				  GFs.AVERAGE_K: 4,
+				  GFs.T: 0.5}
+		e = GFs()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		# perform tests
+		S = rc['S1']
+		self.assertAlmostEqual(S, 1 - numpy.exp(-4 * 0.5 * S), places = 6)
+		
+	def testLargeDegree( self ):
+		'''Test the generating functions of a distribution with a very large
+		maximum degree agree with evaluating every term.'''
+		gf = GeneratingFunction(power_law_pk(2.5, 100000))
+		xs = numpy.linspace(0, 0.999, 11)
+		G_1s = numpy.polynomial.polynomial.polyval(xs, gf._G_1)
+		self.assertTrue(numpy.allclose(gf.G_1(xs), G_1s, rtol = 1e-12))
+		self.assertAlmostEqual(gf.G_1(1.0), 1.0)
+		
+	def testOutbreakDistribution( self ):
+		'''Test the small outbreak sizes on a Poisson distribution follow the
+		Borel distribution with mean <k> T, and sum to 1 - S.'''
+		params = {GFs.GENERATOR: GFs.POISSON,
+				  GFs.AVERAGE_K: 4,
+				  GFs.K_MAX: 80,
+				  GFs.T: 0.5,
+				  GFs.SIZE_DISTRIBUTION: 10000}
+		e = GFs()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		# perform tests
+		pi = rc['pi']
+		self.assertEqual(len(pi), 10001)
+		a = 4 * 0.5
+		s = numpy.arange(1, 11)
+		borel = numpy.exp(-a * s + (s - 1) * numpy.log(a * s) - numpy.cumsum(numpy.log(s)))
+		self.assertTrue(numpy.allclose(pi[1:11], borel, rtol = 1e-10))
+		self.assertAlmostEqual(pi.sum(), 1 - rc['S1'])
+		# changing the results leaves the cached distribution unchanged
+		pi /= pi.sum()
+		gf = e._degrees.generating_function()
+		self.assertTrue(numpy.allclose(e.outbreak_distribution(gf, 0.5, 10)[1:], borel, rtol = 1e-10))
@@ -0,0 +1,109 @@
+# test gfs_overlay for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+#
+# This file is part of `Network_processes`, for epidemic network
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import numpy
+import scipy.sparse
+from scipy.optimize import brentq
+
+class GFsOverlayTest(unittest.TestCase):
+	'''Tests for `GFsOverlay` class in `gfs_overlay.py` and the joint
+	generating functions in `joint.py`.'''
+
+	def setUp( self ):
+		'''Set up the degree distributions.'''
+		self._pk = poisson_pk(4, 40)
+		self._gf = GeneratingFunction(self._pk)
+		self._Ts = numpy.linspace(0.0, 1.0, 21)
+
+	def testJoint( self ):
+		'''Test the generating functions of independent layers are the
+		products of those of each layer, held densely or sparsely.'''
+		pk2 = exponential_pk(2, 60)
+		gf2 = GeneratingFunction(pk2)
+		P = numpy.multiply.outer(self._pk, pk2)
+		xs = numpy.random.random((20, 2))
+		for jgf in [JointGeneratingFunction.independent(self._pk, pk2),
+					JointGeneratingFunction.from_array(scipy.sparse.csr_matrix(P)),
+					JointGeneratingFunction(numpy.argwhere(P > 0), P[P > 0])]:
+			self.assertTrue(numpy.allclose(jgf.G_0(xs), self._gf.G_0(xs[:, 0]) * gf2.G_0(xs[:, 1])))
+			self.assertTrue(numpy.allclose(jgf.G_1(xs)[:, 1], self._gf.G_0(xs[:, 0]) * gf2.G_1(xs[:, 1])))
+			self.assertTrue(numpy.allclose(jgf.G_1_jacobian(xs)[:, 0, 1], self._gf.G_1(xs[:, 0]) * gf2.G_0_prime(xs[:, 1])))
+			self.assertTrue(numpy.allclose(jgf.marginal(1), pk2))
+		# a layer without edges has no G_1
+		with self.assertRaises(ValueError):
+			JointGeneratingFunction([[1, 0], [2, 0]], [0.5, 0.5])
+
+	def testSingleLayer( self ):
+		'''Test a single layer agrees with `GFs.solve`.'''
+		e = GFsOverlay()
+		# keep away from the threshold, where the root is degenerate
+		Ts = self._Ts[self._Ts != 0.25]
+		u, its, res = e.solve(self._gf, Ts, GFs.NEWTON)
+		v, its, res = e.solve_layers(JointGeneratingFunction.from_array(self._pk), Ts[:, numpy.newaxis])
+		self.assertTrue(numpy.allclose(v[:, 0], u))
+		self.assertTrue((res < 1e-9).all())
+
+	def testMergedLayers( self ):
+		'''Test a disease spreading equally on two independent Poisson layers
+		is the same as on a single Poisson layer of twice the mean degree.'''
+		e = GFsOverlay()
+		jgf = JointGeneratingFunction.independent(self._pk, self._pk)
+		T = numpy.stack([self._Ts, self._Ts], axis = -1)
+		v, its, res = e.solve_layers(jgf, T)
+		S = e.layer_outbreak_size(jgf, T, v)
+		gf = GeneratingFunction(poisson_pk(8, 80))
+		u, its, res = e.solve(gf, self._Ts, GFs.NEWTON)
+		self.assertTrue(numpy.allclose(S, e.outbreak_size(gf, self._Ts, u)))
+
+	def testSequential( self ):
+		'''Test the second outbreak on independent layers, where the first
+		only removes nodes, in an experiment given the joint distribution
+		by the `JOINT` generator.'''
+		P = numpy.multiply.outer(self._pk, self._pk)
+		T1 = numpy.array([0.0, 0.3, 0.5])[:, numpy.newaxis]
+		T2 = numpy.array([0.5, 0.9])
+		params = {GFsOverlay.GENERATOR: GFsOverlay.JOINT,
+				  GFsOverlay.JOINT_DISTRIBUTION: P,
+				  GFsOverlay.T1: T1,
+				  GFsOverlay.T2: T2}
+		e = GFsOverlay()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		# perform tests
+		self.assertTrue(e._prototype is None)
+		self.assertAlmostEqual(e._degrees.average_degree(), 4)
+		self.assertEqual(rc['S2'].shape, (3, 2))
+		for i in range(3):
+			u, its, res = e.solve(self._gf, T1[i, 0], GFs.NEWTON)
+			S1 = e.outbreak_size(self._gf, T1[i, 0], u)
+			self.assertAlmostEqual(rc['S1'][i, 0], S1)
+			# the fraction of neighbours left susceptible by the first outbreak
+			s = self._gf.G_0(1 - T1[i, 0] * u)
+			for j in range(2):
+				f = lambda v: v - s * (1 - self._gf.G_1(1 - T2[j] * v))
+				# below the threshold only the trivial solution remains
+				v = brentq(f, 1e-6, 1.0) if f(1e-6) < 0 else 0.0
+				S2 = s * (1 - self._gf.G_0(1 - T2[j] * v))
+				self.assertAlmostEqual(rc['S2'][i, j], S2)
+		self.assertTrue(rc['S2'][0, 1] > rc['S2'][1, 1] > 0)
@@ -0,0 +1,61 @@
+# test gfs_sweep for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import epyc
+import numpy
+
+class GFsSweepTest(unittest.TestCase):
+	'''Tests for `GFsSweep` class in `gfs_sweep.py` using an
+	epyc lab simulation environment. '''
+
+	def setUp( self ):
+		'''Set up the parameters.'''
+		# set lab and test parameters
+		self._lab = epyc.Lab()
+
+		self._lab[GFsSweep.T_MIN] = 0.0
+		self._lab[GFsSweep.T_MAX] = 1.0
+		self._lab[GFsSweep.T_POINTS] = 50
+		self._lab[GFsSweep.N] = 5000
+		self._lab[GFsSweep.AVERAGE_K] = 5
+
+		# repetitions at each point in the parameter space
+		self._repetitions = 1
+
+	def testSweep( self ):
+		'''Test the swept outbreak sizes grow with T and agree
+		with solving each point independently.'''
+		# instance class
+		e = GFsSweep()
+		# perform the experiments
+		self._lab.runExperiment(epyc.RepeatedExperiment(e, self._repetitions))
+		# extract the results
+		rc = (self._lab.results())[0][epyc.Experiment.RESULTS]
+		# perform tests
+		S1 = rc['S1']
+		self.assertEqual(len(S1), 50)
+		self.assertTrue((numpy.diff(S1) >= -1e-10).all())
+		self.assertTrue(S1[-1] > 0)
+
+		gf = GeneratingFunction.from_dict(rc['Pk'])
+		u, its, res = e.solve(gf, rc['T'], GFs.NEWTON)
+		self.assertTrue(numpy.allclose(S1, e.outbreak_size(gf, rc['T'], u)))
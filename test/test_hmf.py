@@ -20,23 +20,154 @@
 
 from network_processes import *
 import unittest
+import numpy
 
 class HMFTest(unittest.TestCase):
-	'''Tests for `HMF` class in `hmf.py`. ```
+	'''Tests for `HMF` class in `hmf.py`. '''
 	
 	def setUp( self ):
-		return pass 
+		'''Set up the parameters.'''
+		self._params = {HMF.N: 2000,
+						HMF.AVERAGE_K: 5,
+						HMF.GENERATOR: HMF.ERDOS_RENYI,
+						'pInfected': 0.01,
+						'pInfect': 0.1,
+						'pRecover': 0.5}
+		
+	def run_hmf( self, params ):
+		'''Run a single HMF experiment and return its results.'''
+		e = HMF()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		return rc
 	
-	def testhmf( self ):
-		raise Exception('Not implemented yet! (test hmf)')
-
-
+	def testStacked( self ):
+		'''Test the stacked system agrees with integrating each class.'''
+		numpy.random.seed(1)
+		rc = self.run_hmf(self._params)
+		params = dict(self._params)
+		params[HMF.SYSTEM] = HMF.STACKED
+		numpy.random.seed(1)
+		rc_stacked = self.run_hmf(params)
+		# perform tests
+		self.assertAlmostEqual(sum(rc['final_state']), 1.0)
+		self.assertTrue(numpy.allclose(rc['final_state'], rc_stacked['final_state'], atol = 1e-5))
 	
-
-
-
-
-
-
-
-
+	def testCoupled( self ):
+		'''Test the coupled system conserves the population.'''
+		params = dict(self._params)
+		params[HMF.SYSTEM] = HMF.COUPLED
+		rc = self.run_hmf(params)
+		# perform tests
+		self.assertAlmostEqual(sum(rc['final_state']), 1.0)
+		self.assertTrue(rc['final_state'][2] > 0)
+		
+	def testIsolatedNodes( self ):
+		'''Test nodes of degree zero, which an analytic Poisson distribution
+		has, do not take part in the epidemic: it is the same as on the
+		distribution without them, with the isolated nodes added back.'''
+		params = {HMF.GENERATOR: HMF.POISSON,
+				  HMF.AVERAGE_K: 1.5,
+				  HMF.K_MAX: 20,
+				  'pInfected': 0.01,
+				  'pInfect': 0.8,
+				  'pRecover': 0.5}
+		pk = HMF().degree_probabilities(params)
+		P_0 = pk[0]
+		params_removed = dict(params)
+		params_removed[HMF.GENERATOR] = HMF.DISTRIBUTION
+		params_removed[HMF.DEGREE_DISTRIBUTION] = numpy.concatenate([[0], pk[1:]]) / (1 - P_0)
+		# the isolated nodes only recover
+		isolated = numpy.array([0.99, 0.0, 0.01])
+		for system in [HMF.PER_CLASS, HMF.STACKED, HMF.COUPLED]:
+			params[HMF.SYSTEM] = params_removed[HMF.SYSTEM] = system
+			rc = self.run_hmf(params)
+			rc_removed = self.run_hmf(params_removed)
+			# perform tests
+			self.assertTrue(rc_removed['final_state'][2] > 0.1)
+			self.assertTrue(numpy.allclose(rc['final_state'], P_0 * isolated + (1 - P_0) * rc_removed['final_state'], atol = 1e-6))
+	
+	def testJacobian( self ):
+		'''Test the analytic Jacobians against finite differences, and that
+		the coupled Jacobian stays sparse.'''
+		e = HMF()
+		ks = numpy.arange(1, 6)
+		weights = numpy.random.random(5)
+		h = 1e-7
+		for (model, jacobian, a, n) in [(e.stacked_model, e.stacked_jacobian, 0.7, 15),
+										(e.coupled_model, e.coupled_jacobian, weights, 16)]:
+			y = numpy.random.random(n)
+			f = model(0, y, 0.3, 0.5, ks, a)
+			J = numpy.array([ (model(0, y + h * d, 0.3, 0.5, ks, a) - f) / h 
+							  for d in numpy.eye(n) ]).T
+			# perform tests
+			self.assertTrue(numpy.allclose(jacobian(0, y, 0.3, 0.5, ks, a).toarray(), J, atol = 1e-5))
+		K = 10000
+		ks = numpy.arange(1, K + 1)
+		J = e.coupled_jacobian(0, numpy.random.random(3 * K + 1), 0.3, 0.5, ks, numpy.ones(K) / K)
+		self.assertTrue(J.nnz < 10 * K)
+	
+	def testStiff( self ):
+		'''Test the implicit solvers agree with the default.'''
+		params = dict(self._params)
+		params[HMF.SYSTEM] = HMF.COUPLED
+		numpy.random.seed(1)
+		rc = self.run_hmf(params)
+		for method in ['BDF', 'LSODA']:
+			params[HMF.METHOD] = method
+			numpy.random.seed(1)
+			rc_stiff = self.run_hmf(params)
+			# perform tests
+			self.assertTrue(numpy.allclose(rc['final_state'], rc_stiff['final_state'], atol = 1e-4))
+	
+	def testTrajectory( self ):
+		'''Test the trajectory is reported at the requested times.'''
+		params = dict(self._params)
+		params[HMF.TIMES] = numpy.linspace(0, 150, 51)
+		params[HMF.BUFFER_SIZE] = 20
+		for system in [HMF.PER_CLASS, HMF.COUPLED]:
+			params[HMF.SYSTEM] = system
+			rc = self.run_hmf(params)
+			# perform tests
+			self.assertEqual(rc['trajectory'].shape, (51, 3))
+			self.assertTrue(numpy.allclose(rc['times'], params[HMF.TIMES]))
+			self.assertTrue(numpy.allclose(rc['trajectory'][0], [0.99, 0.01, 0.0]))
+			self.assertTrue(numpy.allclose(rc['trajectory'][-1], rc['final_state']))
+			self.assertTrue(numpy.allclose(rc['trajectory'].sum(axis = 1), 1.0))
+	
+	def testEarlyTermination( self ):
+		'''Test the integration stops once the epidemic has died out.'''
+		params = dict(self._params)
+		params['pInfect'] = 0.3
+		params[HMF.SYSTEM] = HMF.COUPLED
+		numpy.random.seed(1)
+		rc = self.run_hmf(params)
+		params[HMF.EXTINCTION] = 1e-4
+		numpy.random.seed(1)
+		rc_stopped = self.run_hmf(params)
+		# perform tests
+		self.assertEqual(rc['stop_time'], 150)
+		self.assertTrue(rc_stopped['stop_time'] < 150)
+		self.assertAlmostEqual(rc_stopped['final_state'][1], 1e-4)
+		self.assertTrue(numpy.allclose(rc['final_state'], rc_stopped['final_state'], atol = 1e-3))
+		# the classes cannot stop together if integrated separately
+		params[HMF.SYSTEM] = HMF.PER_CLASS
+		with self.assertRaises(ValueError):
+			self.run_hmf(params)
+	
+	def testTimes( self ):
+		'''Test the trajectory needs at least one time, in increasing order 
+		and within the horizon.'''
+		params = dict(self._params)
+		params[HMF.SYSTEM] = HMF.COUPLED
+		params[HMF.TIMES] = []
+		with self.assertRaises(ValueError):
+			self.run_hmf(params)
+		with self.assertRaises(ValueError):
+			HMF().check_times(params, [0, 20, 10])
+		params[HMF.TIMES] = numpy.linspace(0, 150, 51)
+		params[HMF.HORIZON] = 100
+		with self.assertRaises(ValueError):
+			self.run_hmf(params)
@@ -21,6 +21,7 @@
 from network_processes import *
 import unittest
 import networkx
+import numpy
 
 class sample_experiment0( NETWORK ):
     '''A sample experiment that subclasses `NETWORK` and tests its 
@@ -84,3 +85,50 @@ class NetworkTest( unittest.TestCase ):
         # assertTrue that network has no degree-zero nodes 
         self.assertFalse(networkx.isolates(rc[epyc.Experiment.RESULTS]['network']))
         
+    def testDegreeDistribution( self ):
+        '''Test the cached moments of `DegreeDistribution`.'''
+        d = DegreeDistribution([1, 1, 2, 3, 3, 3])
+        
+        # assert counts, order and maximum degree
+        self.assertEqual(list(d.Nk()), [0, 2, 1, 3])
+        self.assertEqual(d.order(), 6)
+        self.assertEqual(d.k_max(), 3)
+        
+        # assert the moments
+        self.assertAlmostEqual(d.average_degree(), 13.0 / 6)
+        self.assertAlmostEqual(d.second_moment(), 33.0 / 6)
+        
+        # assert the dictionary form agrees with `average_degree`
+        e = sample_experiment0()
+        self.assertAlmostEqual(e.average_degree(d.as_dict()), d.average_degree())
+        
+        
+    def testAnalyticDistributions( self ):
+        '''Test the analytic generators give a degree distribution and no network.'''
+        for (generator, params) in [(NETWORK.POISSON, {NETWORK.AVERAGE_K: 5}),
+                                    (NETWORK.EXPONENTIAL, {NETWORK.AVERAGE_K: 5}),
+                                    (NETWORK.POWER_LAW, {NETWORK.EXPONENT: 2.5, NETWORK.CUTOFF: 50}),
+                                    (NETWORK.POWER_LAW, {NETWORK.EXPONENT: 2.5, NETWORK.K_MAX: 10000}),
+                                    (NETWORK.DISTRIBUTION, {NETWORK.DEGREE_DISTRIBUTION: [0, 1, 1, 2]})]:
+            params[NETWORK.GENERATOR] = generator
+            e = sample_experiment0()
+            e.configure(params)
+            d = e._degrees
+            
+            # assert the distribution is normalised, with no network
+            self.assertAlmostEqual(d.pk().sum(), 1.0)
+            self.assertAlmostEqual(sum(d.as_dict().values()), 1.0)
+            self.assertTrue(d.order() is None)
+            with self.assertRaises(ValueError):
+                e.sparse_network()
+            
+        # assert the truncated distributions have the right means and tails
+        self.assertAlmostEqual(numpy.dot(numpy.arange(101), poisson_pk(5, 100)), 5)
+        self.assertAlmostEqual(numpy.dot(numpy.arange(1001), exponential_pk(5, 1000)), 5)
+        pk = power_law_pk(2.5, 100)
+        self.assertEqual(pk[0], 0)
+        self.assertAlmostEqual(pk[1] / pk[2], 2 ** 2.5)
+        
+        # assert a power law needs a cutoff or a maximum degree
+        with self.assertRaises(ValueError):
+            sample_experiment0().configure({NETWORK.GENERATOR: NETWORK.POWER_LAW, NETWORK.EXPONENT: 2.5})
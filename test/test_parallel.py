@@ -0,0 +1,67 @@
+# test parallel for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import epyc
+
+class ParallelTest(unittest.TestCase):
+	'''Tests for `ParallelRepeatedExperiment` class in `parallel.py` using an
+	epyc lab simulation environment. '''
+
+	def setUp( self ):
+		'''Set up the parameters.'''
+		# set lab and test parameters
+		self._lab = epyc.Lab()
+
+		self._lab[PERCOLATION.T] = 0.3
+		self._lab[PERCOLATION.N] = 5000
+		self._lab[PERCOLATION.AVERAGE_K] = 5
+
+		# repetitions at each point in the parameter space
+		self._repetitions = 4
+
+	def testRepetitions( self ):
+		'''Test every repetition is run, with independent random streams.'''
+		# instance class
+		e = PERCOLATION()
+		# perform the experiments
+		self._lab.runExperiment(ParallelRepeatedExperiment(e, self._repetitions, processes = 2))
+		# extract the results
+		rcs = self._lab.results()
+		# perform tests
+		self.assertEqual(len(rcs), self._repetitions)
+		fs = [ rc[epyc.Experiment.RESULTS]['occupied_fraction'] for rc in rcs ]
+		self.assertTrue(len(set(fs)) > 1)
+
+
+	def testMetadata( self ):
+		'''Test each result records its repetition, as with `epyc.RepeatedExperiment`.'''
+		self._lab[PERCOLATION.GENERATOR] = PERCOLATION.ERDOS_RENYI
+		# instance class
+		e = PERCOLATION()
+		# perform the experiments
+		self._lab.runExperiment(ParallelRepeatedExperiment(e, self._repetitions, processes = 2))
+		# extract the results
+		rcs = self._lab.results()
+		# perform tests
+		ms = [ rc[epyc.Experiment.METADATA] for rc in rcs ]
+		self.assertEqual(sorted([ m[epyc.RepeatedExperiment.I] for m in ms ]), list(range(self._repetitions)))
+		self.assertTrue(all([ m[epyc.RepeatedExperiment.REPETITIONS] == self._repetitions for m in ms ]))
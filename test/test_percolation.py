@@ -39,7 +39,7 @@ class PercolationTest(unittest.TestCase):
 		self._repetitions = 1
 
 	def testEpidemic( self ):
-		''''Test an epidemic occurs.'''
+		'''Test an epidemic occurs.'''
 		# instance class
 		e = PERCOLATION()
 		# perform the experiments
@@ -51,3 +51,53 @@ class PercolationTest(unittest.TestCase):
 		
 
 
+	def testSharedPrototype( self ):
+		'''Test the prototype network is shared and left unmodified.'''
+		params = {PERCOLATION.T: 0.6, 
+				  PERCOLATION.N: 5000, 
+				  PERCOLATION.AVERAGE_K: 5, 
+				  PERCOLATION.GENERATOR: PERCOLATION.ERDOS_RENYI}
+		e = PERCOLATION()
+		e.configure(params)
+		E = e._prototype.number_of_edges()
+		e.setUp(params)
+		rc = e.do(params)
+		# perform tests
+		self.assertTrue(e._network is e._prototype)
+		self.assertEqual(e._prototype.number_of_edges(), E)
+		self.assertTrue(e._edge_mask.sum() < E)
+		self.assertTrue(rc['occupied_fraction'] > 0)
+		e.tearDown()
+
+	def testSitePercolation( self ):
+		'''Test site and joint site/bond percolation remove nodes.'''
+		for mode in [PERCOLATION.SITE, PERCOLATION.SITE_BOND]:
+			params = {PERCOLATION.T: 0.9, 
+					  PERCOLATION.OCCUPATION: 0.6, 
+					  PERCOLATION.MODE: mode, 
+					  PERCOLATION.N: 5000, 
+					  PERCOLATION.AVERAGE_K: 5, 
+					  PERCOLATION.GENERATOR: PERCOLATION.ERDOS_RENYI}
+			e = PERCOLATION()
+			e.configure(params)
+			e.setUp(params)
+			rc = e.do(params)
+			# perform tests
+			self.assertTrue(0 < rc['occupied_fraction'] <= e._node_mask.mean())
+			e.tearDown()
+
+	def testConfiguration( self ):
+		'''Test a configuration model network, which has no `N` parameter,
+		is normalised by the size of the network left after removing isolates.'''
+		ks = [2] * 2000 + [0] * 1000
+		params = {PERCOLATION.T: 1.0, 
+				  PERCOLATION.DEGREE_SEQUENCE: ks, 
+				  PERCOLATION.GENERATOR: PERCOLATION.CONFIGURATION}
+		e = PERCOLATION()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		# perform tests
+		self.assertTrue(e._prototype.order() <= 2000)
+		self.assertTrue(0 < rc['occupied_fraction'] <= 1)
+		e.tearDown()
@@ -0,0 +1,74 @@
+# test percolation_sweep for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import epyc
+import numpy
+
+class PercolationSweepTest(unittest.TestCase):
+	'''Tests for `PERCOLATIONSweep` class in `percolation_sweep.py` using an
+	epyc lab simulation environment. '''
+
+	def setUp( self ):
+		'''Set up the parameters.'''
+		# set lab and test parameters
+		self._lab = epyc.Lab()
+
+		self._lab[PERCOLATIONSweep.T_MIN] = 0.0
+		self._lab[PERCOLATIONSweep.T_MAX] = 1.0
+		self._lab[PERCOLATIONSweep.T_POINTS] = 11
+		self._lab[PERCOLATIONSweep.N] = 5000
+		self._lab[PERCOLATIONSweep.AVERAGE_K] = 5
+
+		# repetitions at each point in the parameter space
+		self._repetitions = 1
+
+	def testEpidemic( self ):
+		'''Test the occupied fraction grows with T and an epidemic occurs.'''
+		# instance class
+		e = PERCOLATIONSweep()
+		# perform the experiments
+		self._lab.runExperiment(epyc.RepeatedExperiment(e, self._repetitions))
+		# extract the results
+		rc = (self._lab.results())[0]
+		# perform tests
+		S = rc[epyc.Experiment.RESULTS]['occupied_fraction']
+		self.assertTrue((numpy.diff(S) >= 0).all())
+		self.assertTrue(S[-1] > 0.5)
+
+	def testConfiguration( self ):
+		'''Test a configuration model network, which has no `N` parameter,
+		is normalised by the size of the network left after removing isolates.'''
+		ks = [3] * 3000 + [0] * 1000
+		params = {PERCOLATIONSweep.T_MIN: 0.0, 
+				  PERCOLATIONSweep.T_MAX: 1.0, 
+				  PERCOLATIONSweep.T_POINTS: 11, 
+				  PERCOLATIONSweep.DEGREE_SEQUENCE: ks, 
+				  PERCOLATIONSweep.GENERATOR: PERCOLATIONSweep.CONFIGURATION}
+		e = PERCOLATIONSweep()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		# perform tests
+		S = rc['occupied_fraction']
+		self.assertEqual(S[0], 1.0 / e._prototype.order())
+		self.assertTrue(0.9 < S[-1] <= 1)
@@ -0,0 +1,76 @@
+# test sir for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import numpy
+
+class SIRTest(unittest.TestCase):
+	'''Tests for `SIR` class in `sir.py`. '''
+	
+	def setUp( self ):
+		'''Set up the parameters.'''
+		self._params = {SIR.N: 20000,
+						SIR.AVERAGE_K: 5,
+						SIR.GENERATOR: SIR.ERDOS_RENYI,
+						SIR.TIMES: [0, 5, 10, 100],
+						'pInfected': 0.001,
+						'pInfect': 0.4,
+						'pRecover': 0.5}
+		
+	def testFinalSize( self ):
+		'''Test the final size agrees with generating functions, and the
+		trajectory conserves the population.'''
+		e = SIR()
+		e.configure(self._params)
+		e.setUp(self._params)
+		rc = e.do(self._params)
+		e.tearDown()
+		
+		# the Markovian process percolates with T = pInfect / (pInfect + pRecover)
+		gf = e._degrees.generating_function()
+		T = 0.4 / 0.9
+		(u, iterations, residual) = GFs().solve(gf, T, GFs.NEWTON)
+		S, I, R = rc['final_state']
+		N = e._degrees.order()
+		# perform tests
+		self.assertEqual(S + I + R, N)
+		self.assertAlmostEqual(R / (N + 0.0), GFs().outbreak_size(gf, T, u), delta = 0.03)
+		self.assertTrue((rc['trajectory'].sum(axis = 1) == N).all())
+		self.assertEqual(rc['trajectory'][-1].tolist(), rc['final_state'].tolist())
+		self.assertTrue(rc['stop_time'] < 100)
+		
+	def testNonMarkovian( self ):
+		'''Test a process that always transmits infects exactly the component
+		of the seed.'''
+		e = SIR()
+		e.initialisation = lambda params, N: numpy.array([0])
+		e.transmission_times = lambda params, n: numpy.zeros(n)
+		e.recovery_times = lambda params, n: numpy.ones(n)
+		e.configure(self._params)
+		e.setUp(self._params)
+		rc = e.do(self._params)
+		e.tearDown()
+		
+		# perform tests
+		self.assertEqual(rc['stop_time'], 1.0)
+		self.assertEqual(rc['trajectory'][1].tolist(), rc['final_state'].tolist())
+		labels = component_labels(e._degrees.order(), e.edge_array())
+		self.assertEqual(rc['final_state'][2], (labels == labels[0]).sum())
@@ -0,0 +1,61 @@
+# test sparse for `Network-processes`
+#
+# Copyright (C) 2017 Peter Mann
+# 
+# This file is part of `Network_processes`, for epidemic network 
+# analytical results using Python.
+#
+# `Network_processes` is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# `Network_processes` is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with `Network_processes`. If not, see <http://www.gnu.org/licenses/gpl.html>.
+
+from network_processes import *
+import unittest
+import numpy
+
+class SparseNetworkTest( unittest.TestCase ):
+    '''Test class for `SparseNetwork` and the generators in `sparse.py`.'''
+    
+    def testFromEdges( self ):
+        '''Test self-loops, multi-edges and isolates are removed.'''
+        g = SparseNetwork.from_edges(6, [[0, 1], [1, 0], [2, 2], [3, 4], [1, 3]])
+        self.assertEqual(list(g.degrees()), [1, 2, 0, 2, 1, 0])
+        self.assertEqual(g.edges(), [(0, 1), (1, 3), (3, 4)])
+        
+        # assert the isolates are removed and nodes relabelled
+        h = g.without_isolates()
+        self.assertEqual(h.order(), 4)
+        self.assertEqual(h.edges(), [(0, 1), (1, 2), (2, 3)])
+        
+        # assert the networkx conversion has the same edges
+        self.assertEqual(sorted(h.to_networkx().edges()), h.edges())
+        
+    def testErdosRenyi( self ):
+        '''Test the geometric-skip generator covers every pair exactly once 
+        when p = 1, and gives the right average degree otherwise.'''
+        es = erdos_renyi_edges(50, 1.0)
+        self.assertEqual(len(es), 50 * 49 // 2)
+        self.assertEqual(len(set(map(tuple, es.tolist()))), len(es))
+        
+        g = SparseNetwork.from_edges(20000, erdos_renyi_edges(20000, 5.0 / 20000))
+        self.assertTrue(4.8 <= g.degrees().mean() <= 5.2)
+        
+    def testConfigurationModel( self ):
+        '''Test the configuration model approximately preserves the degree sequence.'''
+        ks = numpy.array([3, 2] * 5000)
+        g = SparseNetwork.from_edges(len(ks), configuration_model_edges(ks))
+        self.assertTrue((g.degrees() <= ks).all())
+        self.assertTrue(g.number_of_edges() > 0.99 * ks.sum() / 2)
+        
+        # assert an odd degree sum is rejected
+        with self.assertRaises(ValueError):
+            configuration_model_edges([1, 1, 1])
@@ -20,17 +20,166 @@
 
 from network_processes import *
 import unittest
+import numpy
 
 class STOTest(unittest.TestCase):
-	'''Tests for `STO` class in `sto.py`. ```
-
-
+	'''Tests for `STO` class in `sto.py`. '''
 	
-
-
-
-
-
-
-
-
+	def setUp( self ):
+		'''Set up the parameters.'''
+		self._params = {STO.N: 2000,
+						STO.AVERAGE_K: 5,
+						STO.GENERATOR: STO.ERDOS_RENYI,
+						'pInfected': 0.05,
+						'pInfect': 0.4,
+						'pRecover': 0.5}
+		
+	def run_sto( self, params ):
+		'''Run a single STO experiment and return its results.'''
+		e = STO()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		return rc
+	
+	def testCoupled( self ):
+		'''Test the coupled simulation conserves the population and
+		runs until there are no infecteds left.'''
+		params = dict(self._params)
+		params[STO.SYSTEM] = STO.COUPLED
+		rc = self.run_sto(params)
+		S, I, R = rc['final_state']
+		# perform tests
+		N = sum([ sum(y) for y in rc['y0'].values() ])
+		self.assertEqual(S + I + R, N)
+		self.assertEqual(I, 0)
+		self.assertTrue(R > 0)
+	
+	def testSSA( self ):
+		'''Test the optimised per-class simulation conserves the population
+		and agrees with the rates from `compute_rates`.'''
+		params = dict(self._params)
+		params[STO.ALGORITHM] = STO.SSA
+		params[STO.BATCH] = 100
+		rc = self.run_sto(params)
+		S, I, R = rc['final_state']
+		# perform tests
+		N = sum([ sum(y) for y in rc['y0'].values() ])
+		self.assertEqual(S + I + R, N)
+		self.assertEqual(I, 0)
+		self.assertTrue(R > 0)
+		# the rate function matches the rates
+		e = STO()
+		Pk = {1: 0.2, 3: 0.5, 6: 0.3}
+		r = [0.0, 0.0]
+		e.rate_function(params, 3, 3.5, Pk)([90, 8, 2], r)
+		self.assertTrue(numpy.allclose(r, e.compute_rates(params, numpy.array([90, 8, 2]), 3, 3.5, Pk)))
+	
+	def testSSASubclass( self ):
+		'''Test the optimised per-class simulation uses the rates and the
+		stopping rule of a subclass.'''
+		class Immediate( STO ):
+			def compute_rates( self, params, state, k, ave_k, Pk ):
+				S, I, R = state
+				return [0.0, 10.0 * I]
+			def at_equilibrium( self, t ):
+				return t > 1e-3
+		params = dict(self._params)
+		params[STO.ALGORITHM] = STO.SSA
+		e = Immediate()
+		r = [0.0, 0.0]
+		e.rate_function(params, 3, 3.5, {3: 1.0})([90, 8, 2], r)
+		self.assertEqual(r, [0.0, 80.0])
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		# no infections, and stopped before every recovery
+		S, I, R = rc['final_state']
+		S0 = sum([ y[0] for y in rc['y0'].values() ])
+		self.assertEqual(S, S0)
+		self.assertTrue(I > 0)
+	
+	def testTauLeap( self ):
+		'''Test tau-leaping conserves the population and runs until there 
+		are no infecteds left, with adaptive and fixed leaps.'''
+		for (system, tau) in [(STO.PER_CLASS, None), (STO.COUPLED, None), (STO.COUPLED, 0.1)]:
+			params = dict(self._params)
+			params[STO.ALGORITHM] = STO.TAU_LEAP
+			params[STO.SYSTEM] = system
+			if tau is not None:
+				params[STO.TAU] = tau
+			rc = self.run_sto(params)
+			S, I, R = rc['final_state']
+			# perform tests
+			N = sum([ sum(y) for y in rc['y0'].values() ])
+			self.assertEqual(S + I + R, N)
+			self.assertEqual(I, 0)
+			self.assertTrue(R > 0)
+	
+	def testCoupledSSA( self ):
+		'''Test the O(log K) coupled simulation conserves the population and
+		runs until there are no infecteds left.'''
+		params = dict(self._params)
+		params[STO.SYSTEM] = STO.COUPLED
+		params[STO.ALGORITHM] = STO.SSA
+		rc = self.run_sto(params)
+		S, I, R = rc['final_state']
+		# perform tests
+		N = sum([ sum(y) for y in rc['y0'].values() ])
+		self.assertEqual(S + I + R, N)
+		self.assertEqual(I, 0)
+		self.assertTrue(R > 0)
+	
+	def testCoupledSSASubclass( self ):
+		'''Test the coupled simulation of a subclass with its own rates uses
+		those rates rather than the SIR ones.'''
+		class RecoveryOnly( STO ):
+			def compute_coupled_rates( self, params, states, ks, weights ):
+				return numpy.column_stack([numpy.zeros(len(ks)), params['pRecover'] * states[:, 1]])
+		params = dict(self._params)
+		params[STO.SYSTEM] = STO.COUPLED
+		params[STO.ALGORITHM] = STO.SSA
+		e = RecoveryOnly()
+		e.configure(params)
+		e.setUp(params)
+		rc = e.do(params)
+		e.tearDown()
+		S, I, R = rc['final_state']
+		# perform tests
+		S0 = sum([ y[0] for y in rc['y0'].values() ])
+		self.assertEqual(S, S0)
+		self.assertEqual(I, 0)
+	
+	def testEnsemble( self ):
+		'''Test an ensemble is reproducible given its seed, whether run in 
+		turn or across worker processes.'''
+		params = dict(self._params)
+		params[STO.SYSTEM] = STO.COUPLED
+		params[STO.ALGORITHM] = STO.SSA
+		params[STO.ENSEMBLE] = 8
+		params[STO.SEED] = 42
+		numpy.random.seed(1)
+		rc = self.run_sto(params)
+		params[STO.PROCESSES] = 2
+		numpy.random.seed(1)
+		rc_parallel = self.run_sto(params)
+		# perform tests
+		self.assertEqual(rc['ensemble_size'], 8)
+		self.assertTrue(numpy.allclose(rc['final_state_mean'], rc_parallel['final_state_mean']))
+		self.assertTrue(numpy.allclose(rc['final_state_quantiles'], rc_parallel['final_state_quantiles']))
+		self.assertTrue(rc['final_state_variance'][2] > 0)
+		self.assertEqual(rc['final_state_quantiles'].shape, (3, 3))
+	
+	def testNoNetwork( self ):
+		'''Test the simulation refuses to run on an analytic distribution.'''
+		params = {STO.GENERATOR: STO.POISSON,
+				  STO.AVERAGE_K: 5,
+				  'pInfected': 0.05,
+				  'pInfect': 0.4,
+				  'pRecover': 0.5}
+		e = STO()
+		e.configure(params)
+		with self.assertRaises(ValueError):
+			e.setUp(params)